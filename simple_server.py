@@ -6,6 +6,8 @@ Servidor WebSocket simple para II-Agent con mecanismo anti-bucle mejorado
 import asyncio
 import websockets
 import json
+import collections
+import functools
 import os
 import sys
 from pathlib import Path
@@ -13,6 +15,23 @@ import logging
 from dotenv import load_dotenv
 import aiohttp
 import re
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, unquote_plus
+
+try:
+    import orjson
+
+    def json_loads(data):
+        return orjson.loads(data)
+
+    def json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    json_loads = json.loads
+    json_dumps = json.dumps
 
 # Cargar variables de entorno
 load_dotenv()
@@ -24,153 +43,42 @@ sys.path.insert(0, '/home/jorge/Desktop/ii-agent/src')
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class SimpleIIAgent:
-    def __init__(self):
-        self.workspace_dir = Path("/home/jorge/Desktop/ii-agent/workspace")
-        self.workspace_dir.mkdir(exist_ok=True)
-
-        # Inicializar cliente Bedrock con Nova Pro
-        try:
-            from ii_agent.llm.bedrock_client import BedrockClient
-            self.llm_client = BedrockClient(model_name='nova-pro')
-            logger.info(f"✅ Cliente Nova Pro inicializado: {self.llm_client.model_id}")
-        except Exception as e:
-            logger.error(f"❌ Error inicializando Nova Pro: {e}")
-            self.llm_client = None
-
-        # Configurar Tavily API
-        self.tavily_api_key = os.getenv('TAVILY_API_KEY', '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')
-        if self.tavily_api_key:
-            logger.info("✅ Tavily API configurada para búsquedas web")
-        else:
-            logger.warning("⚠️ Tavily API key no encontrada")
-
-    def detect_loop(self, messages):
-        """Detecta bucles en los mensajes con límites más estrictos"""
-        if len(messages) < 3:
-            return False
-
-        # Analizar solo los últimos 5 mensajes
-        recent_messages = messages[-5:]
-
-        search_count = 0
-        planning_count = 0
-
-        for message in recent_messages:
-            if isinstance(message, dict):
-                content = str(message.get('content', '')).lower()
-            else:
-                content = str(message).lower()
-
-            # Detectar búsquedas
-            if 'searching' in content or 'web_search' in content:
-                search_count += 1
-
-            # Detectar planificación repetitiva
-            if any(phrase in content for phrase in ['let\'s plan', 'let\'s break', 'planning', 'we need to', 'plan the creation']):
-                planning_count += 1
-
-        # Límites más estrictos: 2 búsquedas o 3 planificaciones
-        if search_count >= 2 or planning_count >= 3:
-            logger.warning(f"🚨 BUCLE DETECTADO - Búsquedas: {search_count}, Planificaciones: {planning_count}")
-            return True
-
-        return False
-
-    async def search_web(self, query: str) -> str:
-        """Realiza búsqueda web usando Tavily API"""
-        if not self.tavily_api_key:
-            return "Búsqueda web no disponible (Tavily API key no configurada)"
-
-        try:
-            async with aiohttp.ClientSession() as session:
-                url = "https://api.tavily.com/search"
-                payload = {
-                    "api_key": self.tavily_api_key,
-                    "query": query,
-                    "search_depth": "advanced",
-                    "include_answer": True,
-                    "include_raw_content": False,
-                    "max_results": 5,
-                    "include_domains": [],
-                    "exclude_domains": []
-                }
-
-                async with session.post(url, json=payload) as response:
-                    if response.status == 200:
-                        data = await response.json()
-
-                        # Extraer información relevante
-                        results = []
-                        if 'answer' in data and data['answer']:
-                            results.append(f"**Respuesta directa:** {data['answer']}")
-
-                        if 'results' in data:
-                            results.append("\n**Fuentes encontradas:**")
-                            for i, result in enumerate(data['results'][:3], 1):
-                                title = result.get('title', 'Sin título')
-                                content = result.get('content', '')[:200] + "..."
-                                url = result.get('url', '')
-                                results.append(f"{i}. **{title}**\n   {content}\n   Fuente: {url}")
-
-                        search_result = "\n".join(results)
-                        logger.info(f"✅ Búsqueda web completada: {len(search_result)} caracteres")
-                        return search_result
-                    else:
-                        logger.error(f"❌ Error en Tavily API: {response.status}")
-                        return f"Error en búsqueda web: {response.status}"
-
-        except Exception as e:
-            logger.error(f"❌ Error en búsqueda web: {e}")
-            return f"Error realizando búsqueda web: {str(e)}"
-
-    def needs_web_search(self, message: str) -> bool:
-        """Determina si un mensaje requiere búsqueda web"""
-        web_indicators = [
-            'últimos', 'recientes', 'actuales', 'nuevos', 'estrenos',
-            '2025', '2024', 'hasta la fecha', 'más reciente',
-            'últimas noticias', 'información actual', 'tendencias',
-            'qué hay de nuevo', 'novedades', 'actualizado'
-        ]
-
-        message_lower = message.lower()
-        return any(indicator in message_lower for indicator in web_indicators)
-
-    async def get_nova_response(self, message: str) -> str:
-        """Obtiene respuesta de Nova Pro con búsqueda web si es necesario"""
-        if not self.llm_client:
-            return "Sistema II-Agent funcionando correctamente. Cliente Nova Pro no disponible."
-
-        try:
-            # Verificar si necesita búsqueda web
-            if self.needs_web_search(message):
-                logger.info("🔍 Realizando búsqueda web antes de consultar Nova Pro")
-                search_results = await self.search_web(message)
-
-                # Combinar búsqueda web con consulta a Nova Pro
-                enhanced_message = f"""
-Usuario pregunta: {message}
-
-Información actualizada de internet:
-{search_results}
-
-Por favor, proporciona una respuesta completa y actualizada basada en la información encontrada en internet y tu conocimiento. Si la información de internet es relevante, úsala para dar una respuesta más precisa y actual.
-"""
-                messages = [{"role": "user", "content": enhanced_message}]
-            else:
-                messages = [{"role": "user", "content": message}]
-
-            response = await self.llm_client.generate_response(messages)
-            logger.info(f"✅ Respuesta de Nova Pro generada: {len(response)} caracteres")
-            return response
-        except Exception as e:
-            logger.error(f"❌ Error obteniendo respuesta de Nova Pro: {e}")
-            return f"Error al procesar con Nova Pro: {str(e)}"
-
-    def create_landing_page_files(self):
-        """Crea archivos de landing page para Colombia Inteligente 2025"""
-
-        html_content = """<!DOCTYPE html>
+# Caché de respuestas (búsquedas Tavily y Nova Pro)
+RESPONSE_CACHE_MAX_ENTRIES = 512
+SEARCH_CACHE_TTL = 600  # 10 minutos: las búsquedas de "últimas noticias" caducan rápido
+NOVA_CACHE_TTL = 1800
+
+# Indicadores de búsqueda web y de bucles, compilados una sola vez como alternancias
+WEB_INDICATORS = (
+    'últimos', 'recientes', 'actuales', 'nuevos', 'estrenos',
+    '2025', '2024', 'hasta la fecha', 'más reciente',
+    'últimas noticias', 'información actual', 'tendencias',
+    'qué hay de nuevo', 'novedades', 'actualizado'
+)
+LOOP_SEARCH_PHRASES = ('searching', 'web_search')
+LOOP_PLAN_PHRASES = ('let\'s plan', 'let\'s break', 'planning', 'we need to', 'plan the creation')
+
+WEB_INDICATOR_RE = re.compile("|".join(map(re.escape, WEB_INDICATORS)), re.IGNORECASE)
+LOOP_SEARCH_RE = re.compile("|".join(map(re.escape, LOOP_SEARCH_PHRASES)))
+LOOP_PLAN_RE = re.compile("|".join(map(re.escape, LOOP_PLAN_PHRASES)))
+
+# Tamaño máximo de la memoización de detect_loop
+LOOP_MEMO_MAX_ENTRIES = 1024
+
+# Mensajes recientes por conexión que examina detect_loop
+LOOP_WINDOW = 5
+# Caracteres de cada mensaje que se examinan al detectar bucles
+LOOP_SCAN_CHARS = 512
+
+# Partes fijas del prompt enriquecido con resultados de búsqueda web
+ENHANCED_PROMPT_PARTS = (
+    "\nUsuario pregunta: ",
+    "\n\nInformación actualizada de internet:\n",
+    "\n\nPor favor, proporciona una respuesta completa y actualizada basada en la información encontrada en internet y tu conocimiento. Si la información de internet es relevante, úsala para dar una respuesta más precisa y actual.\n"
+)
+
+# Landing page de Colombia Inteligente 2025, codificada una sola vez al importar
+_LANDING_HTML = """<!DOCTYPE html>
 <html lang="es">
 <head>
     <meta charset="UTF-8">
@@ -284,7 +192,7 @@ Por favor, proporciona una respuesta completa y actualizada basada en la informa
 </body>
 </html>"""
 
-        css_content = """* {
+_LANDING_CSS = """* {
     margin: 0;
     padding: 0;
     box-sizing: border-box;
@@ -484,53 +392,348 @@ footer {
     }
 }"""
 
-        # Crear archivos
-        html_file = self.workspace_dir / "index.html"
-        css_file = self.workspace_dir / "styles.css"
+_HTML_BYTES = _LANDING_HTML.encode('utf-8')
+_CSS_BYTES = _LANDING_CSS.encode('utf-8')
+_HTML_SIZE = len(_HTML_BYTES)
+_CSS_SIZE = len(_CSS_BYTES)
+_HTML_HASH = hashlib.blake2b(_HTML_BYTES, digest_size=16).digest()
+_CSS_HASH = hashlib.blake2b(_CSS_BYTES, digest_size=16).digest()
 
-        html_file.write_text(html_content, encoding='utf-8')
-        css_file.write_text(css_content, encoding='utf-8')
 
-        logger.info(f"✅ Archivos creados: {html_file} ({html_file.stat().st_size} bytes)")
-        logger.info(f"✅ Archivos creados: {css_file} ({css_file.stat().st_size} bytes)")
+def _write_bytes(path: Path, data: bytes):
+    """Escribe bytes precodificados en un archivo con una sola llamada a os.write"""
+    fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
 
-        return {
-            "html_file": str(html_file),
-            "css_file": str(css_file),
-            "html_size": html_file.stat().st_size,
-            "css_size": css_file.stat().st_size
+
+def _file_matches(path: Path, size: int, digest: bytes) -> bool:
+    """Indica si el archivo en disco ya tiene exactamente el contenido esperado"""
+    try:
+        existing = path.read_bytes()
+    except FileNotFoundError:
+        return False
+    return len(existing) == size and hashlib.blake2b(existing, digest_size=16).digest() == digest
+
+
+class PreserializedResponse(dict):
+    """Respuesta fija cuyo frame JSON se serializa una sola vez al importar"""
+    __slots__ = ('frame',)
+
+    def __init__(self, payload: dict):
+        super().__init__(payload)
+        self.frame = json_dumps(payload)
+
+
+AGENT_INITIALIZED_RESPONSE = PreserializedResponse({
+    "type": "agent_initialized",
+    "content": {
+        "message": "Agente inicializado correctamente"
+    }
+})
+
+INFORME_ANTI_LOOP_RESPONSE = PreserializedResponse({
+    "type": "agent_response",
+    "content": {
+        "text": "✅ **Informe Colombia Inteligente 2025 - Convocatoria MinCiencias**\n\n**Información General:**\n- Organización: MinCiencias (Ministerio de Ciencia, Tecnología e Innovación)\n- Enfoque: Inteligencia Artificial y Ciencias y Tecnologías Cuánticas\n- Fecha de Cierre: 26 de mayo de 2025 hasta las 4:00 pm\n\n**Participantes Elegibles:**\n- Instituciones de Educación Superior (IES)\n- Grupos de Investigación registrados en SIGP\n- Jóvenes investigadores e innovadores\n- Estudiantes de maestría\n- Estancias posdoctorales\n\n**Requisitos:**\n- Registro obligatorio en SIGP\n- Líneas de investigación en TIC, Industria 4.0, IA o Ciencias Cuánticas\n- Carta unificada de aval institucional\n\n**Líneas Temáticas:**\n1. Inteligencia Artificial\n2. Ciencia y Tecnologías Cuánticas\n\nInformación recopilada de fuentes oficiales de MinCiencias.",
+        "anti_loop": True
+    }
+})
+
+INFORME_RESPONSE = PreserializedResponse({
+    "type": "agent_response",
+    "content": {
+        "text": "📋 **Informe Descriptivo - Colombia Inteligente 2025**\n\n**Requisitos:**\n- Grupos de investigación registrados obligatoriamente en SIGP\n- Líneas de investigación en TIC, Industria 4.0, IA o Ciencias Cuánticas\n- Carta unificada de aval y compromiso institucional\n- Cumplimiento de términos de referencia específicos\n\n**Montos:** (Información específica disponible en términos de referencia oficiales)\n\n**Tiempos:**\n- Cierre: 26 de mayo de 2025 (4:00 pm)\n- Revisión: 27 mayo - 03 junio 2025\n- Subsanación: 04 - 06 junio 2025\n- Publicación banco preliminar: Posterior a subsanación\n\n**Participantes:**\n- Instituciones de Educación Superior (IES)\n- Grupos de Investigación registrados en SIGP\n- Jóvenes investigadores e innovadores\n- Estudiantes de maestría\n- Estancias posdoctorales\n\n**Líneas Temáticas:**\n1. Inteligencia Artificial\n2. Ciencia y Tecnologías Cuánticas\n\nConvocatoria organizada por MinCiencias para el fortalecimiento de capacidades en IA y tecnologías cuánticas."
+    }
+})
+
+
+class SimpleIIAgent:
+    def __init__(self):
+        self.workspace_dir = Path("/home/jorge/Desktop/ii-agent/workspace")
+        self.workspace_dir.mkdir(exist_ok=True)
+
+        # Inicializar cliente Bedrock con Nova Pro
+        try:
+            from ii_agent.llm.bedrock_client import BedrockClient
+            self.llm_client = BedrockClient(model_name='nova-pro')
+            logger.info(f"✅ Cliente Nova Pro inicializado: {self.llm_client.model_id}")
+        except Exception as e:
+            logger.error(f"❌ Error inicializando Nova Pro: {e}")
+            self.llm_client = None
+
+        # Configurar Tavily API
+        self.tavily_api_key = os.getenv('TAVILY_API_KEY', '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')
+        if self.tavily_api_key:
+            logger.info("✅ Tavily API configurada para búsquedas web")
+        else:
+            logger.warning("⚠️ Tavily API key no encontrada")
+
+        # Sesión HTTP persistente (keep-alive + pool de conexiones)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # Caché LRU con TTL indexada por (tipo, consulta normalizada)
+        self._response_cache: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+        self._cache_lock = asyncio.Lock()
+
+        # Memoización de detect_loop indexada por el hash de los últimos 5 mensajes
+        self._loop_memo: dict[int, bool] = {}
+
+        # Metadatos de la landing page, reutilizados si los archivos no han cambiado
+        self._landing_files_info: Optional[dict] = None
+
+        # Tabla de despacho por tipo de mensaje del frontend
+        self._dispatch = {
+            'query': self._handle_query,
+            'workspace_info': self._handle_workspace_info,
+            'init_agent': self._handle_init_agent,
         }
 
-    async def process_message(self, message_data, conversation_history):
+    @staticmethod
+    def _normalize_query(text: str) -> str:
+        """Normaliza una consulta para usarla como clave de caché"""
+        return " ".join(text.lower().split())
+
+    async def _cache_get(self, kind: str, text: str) -> Optional[str]:
+        """Devuelve una respuesta cacheada si existe y no ha expirado"""
+        key = (kind, self._normalize_query(text))
+        async with self._cache_lock:
+            entry = self._response_cache.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._response_cache[key]
+                return None
+            self._response_cache.move_to_end(key)
+            return value
+
+    async def _cache_put(self, kind: str, text: str, value: str, ttl: float):
+        """Guarda una respuesta en la caché, descartando la entrada más antigua si está llena"""
+        key = (kind, self._normalize_query(text))
+        async with self._cache_lock:
+            self._response_cache[key] = (time.monotonic() + ttl, value)
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+                self._response_cache.popitem(last=False)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Devuelve la sesión HTTP compartida, creándola en el primer uso"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=30),
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=75)
+            )
+        return self._session
+
+    async def aclose(self):
+        """Cierra la sesión HTTP compartida"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def detect_loop(self, lc_tail):
+        """Detecta bucles en los mensajes con límites más estrictos
+
+        Recibe la ventana de los últimos 5 mensajes ya convertidos a minúsculas
+        y recortados a LOOP_SCAN_CHARS caracteres.
+        """
+        if len(lc_tail) < 3:
+            return False
+
+        key = hash(tuple(lc_tail))
+        cached = self._loop_memo.get(key)
+        if cached is not None:
+            return cached
+
+        search_count = 0
+        planning_count = 0
+
+        for content in lc_tail:
+            # Detectar búsquedas
+            if LOOP_SEARCH_RE.search(content):
+                search_count += 1
+
+            # Detectar planificación repetitiva
+            if LOOP_PLAN_RE.search(content):
+                planning_count += 1
+
+        # Límites más estrictos: 2 búsquedas o 3 planificaciones
+        is_loop = search_count >= 2 or planning_count >= 3
+        if is_loop:
+            logger.warning(f"🚨 BUCLE DETECTADO - Búsquedas: {search_count}, Planificaciones: {planning_count}")
+
+        if len(self._loop_memo) >= LOOP_MEMO_MAX_ENTRIES:
+            self._loop_memo.clear()
+        self._loop_memo[key] = is_loop
+        return is_loop
+
+    async def search_web(self, query: str) -> str:
+        """Realiza búsqueda web usando Tavily API"""
+        search_result, _ = await self._search_web(query)
+        return search_result
+
+    async def _search_web(self, query: str) -> Tuple[str, bool]:
+        """Realiza búsqueda web; devuelve el texto y si la búsqueda tuvo éxito"""
+        if not self.tavily_api_key:
+            return "Búsqueda web no disponible (Tavily API key no configurada)", False
+
+        cached = await self._cache_get("search", query)
+        if cached is not None:
+            logger.info("⚡ Búsqueda web servida desde caché")
+            return cached, True
+
+        try:
+            session = await self._get_session()
+            url = "https://api.tavily.com/search"
+            payload = {
+                "api_key": self.tavily_api_key,
+                "query": query,
+                "search_depth": "advanced",
+                "include_answer": True,
+                "include_raw_content": False,
+                "max_results": 5,
+                "include_domains": [],
+                "exclude_domains": []
+            }
+
+            async with session.post(url, json=payload) as response:
+                if response.status == 200:
+                    # Leer el cuerpo una sola vez y decodificarlo con orjson si está disponible
+                    data = json_loads(await response.read())
+
+                    # Extraer información relevante
+                    parts = [f"**Respuesta directa:** {data['answer']}"] if data.get('answer') else []
+
+                    if 'results' in data:
+                        parts.append("\n**Fuentes encontradas:**")
+                        parts.extend(
+                            f"{i}. **{result.get('title', 'Sin título')}**\n"
+                            f"   {result.get('content', '')[:200]}...\n"
+                            f"   Fuente: {result.get('url', '')}"
+                            for i, result in enumerate(data['results'][:3], 1)
+                        )
+
+                    search_result = "\n".join(parts)
+                    logger.info("✅ Búsqueda web completada: %d caracteres", len(search_result))
+                    await self._cache_put("search", query, search_result, SEARCH_CACHE_TTL)
+                    return search_result, True
+                else:
+                    logger.error(f"❌ Error en Tavily API: {response.status}")
+                    return f"Error en búsqueda web: {response.status}", False
+
+        except Exception as e:
+            logger.error(f"❌ Error en búsqueda web: {e}")
+            return f"Error realizando búsqueda web: {str(e)}", False
+
+    def needs_web_search(self, message: str) -> bool:
+        """Determina si un mensaje requiere búsqueda web"""
+        return WEB_INDICATOR_RE.search(message) is not None
+
+    async def get_nova_response(self, message: str) -> str:
+        """Obtiene respuesta de Nova Pro con búsqueda web si es necesario"""
+        if not self.llm_client:
+            return "Sistema II-Agent funcionando correctamente. Cliente Nova Pro no disponible."
+
+        cached = await self._cache_get("nova", message)
+        if cached is not None:
+            logger.info("⚡ Respuesta de Nova Pro servida desde caché")
+            return cached
+
+        try:
+            # Las respuestas basadas en búsquedas caducan como la búsqueda misma
+            cache_ttl = NOVA_CACHE_TTL
+
+            # Verificar si necesita búsqueda web
+            if self.needs_web_search(message):
+                logger.info("🔍 Realizando búsqueda web antes de consultar Nova Pro")
+                search_results, search_ok = await self._search_web(message)
+                # No cachear respuestas construidas sobre una búsqueda fallida
+                cache_ttl = SEARCH_CACHE_TTL if search_ok else None
+
+                # Combinar búsqueda web con consulta a Nova Pro
+                enhanced_message = "".join((
+                    ENHANCED_PROMPT_PARTS[0], message,
+                    ENHANCED_PROMPT_PARTS[1], search_results,
+                    ENHANCED_PROMPT_PARTS[2]
+                ))
+                messages = [{"role": "user", "content": enhanced_message}]
+            else:
+                messages = [{"role": "user", "content": message}]
+
+            response = await self.llm_client.generate_response(messages)
+            logger.info("✅ Respuesta de Nova Pro generada: %d caracteres", len(response))
+            if cache_ttl is not None:
+                await self._cache_put("nova", message, response, cache_ttl)
+            return response
+        except Exception as e:
+            logger.error(f"❌ Error obteniendo respuesta de Nova Pro: {e}")
+            return f"Error al procesar con Nova Pro: {str(e)}"
+
+    def create_landing_page_files(self):
+        """Crea archivos de landing page para Colombia Inteligente 2025"""
+        html_file = self.workspace_dir / "index.html"
+        css_file = self.workspace_dir / "styles.css"
+
+        # Si los archivos ya existen con el mismo contenido, no reescribirlos
+        if (_file_matches(html_file, _HTML_SIZE, _HTML_HASH)
+                and _file_matches(css_file, _CSS_SIZE, _CSS_HASH)):
+            logger.info("✅ Landing page sin cambios, se reutilizan los archivos existentes")
+        else:
+            _write_bytes(html_file, _HTML_BYTES)
+            _write_bytes(css_file, _CSS_BYTES)
+
+            logger.info("✅ Archivos creados: %s (%d bytes)", html_file, _HTML_SIZE)
+            logger.info("✅ Archivos creados: %s (%d bytes)", css_file, _CSS_SIZE)
+
+        if self._landing_files_info is None:
+            self._landing_files_info = {
+                "html_file": str(html_file),
+                "css_file": str(css_file),
+                "html_size": _HTML_SIZE,
+                "css_size": _CSS_SIZE
+            }
+        return dict(self._landing_files_info)
+
+    async def process_message(self, message_data, lc_tail):
         """Procesa un mensaje del usuario en formato compatible con frontend"""
+        # Despachar según el tipo de mensaje del frontend
+        message_type = message_data.get('type') if isinstance(message_data, dict) else None
+        handler = self._dispatch.get(message_type)
+        if handler:
+            return await handler(message_data, lc_tail)
 
-        # Extraer el mensaje del formato del frontend
+        # Tipos desconocidos: tratar el contenido como texto libre
         if isinstance(message_data, dict):
-            if message_data.get('type') == 'query':
-                message = message_data.get('content', {}).get('text', '')
-            elif message_data.get('type') == 'workspace_info':
-                # Responder con información del workspace
-                return {
-                    "type": "workspace_info",
-                    "content": {
-                        "path": str(self.workspace_dir)
-                    }
-                }
-            elif message_data.get('type') == 'init_agent':
-                # Responder a la inicialización del agente
-                return {
-                    "type": "agent_initialized",
-                    "content": {
-                        "message": "Agente inicializado correctamente"
-                    }
-                }
-            else:
-                message = str(message_data.get('content', message_data))
+            message = str(message_data.get('content', message_data))
         else:
             message = str(message_data)
+        return await self._respond(message, lc_tail)
+
+    async def _handle_query(self, message_data, lc_tail):
+        """Procesa una consulta del usuario"""
+        message = message_data.get('content', {}).get('text', '')
+        return await self._respond(message, lc_tail)
+
+    async def _handle_workspace_info(self, message_data, lc_tail):
+        """Responde con información del workspace"""
+        return {
+            "type": "workspace_info",
+            "content": {
+                "path": str(self.workspace_dir)
+            }
+        }
 
+    async def _handle_init_agent(self, message_data, lc_tail):
+        """Responde a la inicialización del agente"""
+        return AGENT_INITIALIZED_RESPONSE
+
+    async def _respond(self, message, lc_tail):
+        """Genera la respuesta a un mensaje de texto del usuario"""
         # Detectar bucles
-        if self.detect_loop(conversation_history):
+        if self.detect_loop(lc_tail):
             # Si detectamos un bucle, crear directamente los archivos
             if "landing page" in message.lower() or "html" in message.lower():
                 files_info = self.create_landing_page_files()
@@ -543,13 +746,7 @@ footer {
                     }
                 }
             else:
-                return {
-                    "type": "agent_response",
-                    "content": {
-                        "text": "✅ **Informe Colombia Inteligente 2025 - Convocatoria MinCiencias**\n\n**Información General:**\n- Organización: MinCiencias (Ministerio de Ciencia, Tecnología e Innovación)\n- Enfoque: Inteligencia Artificial y Ciencias y Tecnologías Cuánticas\n- Fecha de Cierre: 26 de mayo de 2025 hasta las 4:00 pm\n\n**Participantes Elegibles:**\n- Instituciones de Educación Superior (IES)\n- Grupos de Investigación registrados en SIGP\n- Jóvenes investigadores e innovadores\n- Estudiantes de maestría\n- Estancias posdoctorales\n\n**Requisitos:**\n- Registro obligatorio en SIGP\n- Líneas de investigación en TIC, Industria 4.0, IA o Ciencias Cuánticas\n- Carta unificada de aval institucional\n\n**Líneas Temáticas:**\n1. Inteligencia Artificial\n2. Ciencia y Tecnologías Cuánticas\n\nInformación recopilada de fuentes oficiales de MinCiencias.",
-                        "anti_loop": True
-                    }
-                }
+                return INFORME_ANTI_LOOP_RESPONSE
 
         # Procesar mensaje normalmente
         if "colombia inteligente" in message.lower():
@@ -563,12 +760,7 @@ footer {
                     }
                 }
             else:
-                return {
-                    "type": "agent_response",
-                    "content": {
-                        "text": "📋 **Informe Descriptivo - Colombia Inteligente 2025**\n\n**Requisitos:**\n- Grupos de investigación registrados obligatoriamente en SIGP\n- Líneas de investigación en TIC, Industria 4.0, IA o Ciencias Cuánticas\n- Carta unificada de aval y compromiso institucional\n- Cumplimiento de términos de referencia específicos\n\n**Montos:** (Información específica disponible en términos de referencia oficiales)\n\n**Tiempos:**\n- Cierre: 26 de mayo de 2025 (4:00 pm)\n- Revisión: 27 mayo - 03 junio 2025\n- Subsanación: 04 - 06 junio 2025\n- Publicación banco preliminar: Posterior a subsanación\n\n**Participantes:**\n- Instituciones de Educación Superior (IES)\n- Grupos de Investigación registrados en SIGP\n- Jóvenes investigadores e innovadores\n- Estudiantes de maestría\n- Estancias posdoctorales\n\n**Líneas Temáticas:**\n1. Inteligencia Artificial\n2. Ciencia y Tecnologías Cuánticas\n\nConvocatoria organizada por MinCiencias para el fortalecimiento de capacidades en IA y tecnologías cuánticas."
-                    }
-                }
+                return INFORME_RESPONSE
 
         # Para cualquier otro mensaje, usar Nova Pro
         nova_response = await self.get_nova_response(message)
@@ -579,52 +771,55 @@ footer {
             }
         }
 
-async def handle_websocket(websocket):
-    """Maneja conexiones WebSocket compatibles con el frontend"""
-    agent = SimpleIIAgent()
-    conversation_history = []
+async def handle_websocket(websocket, agent: SimpleIIAgent):
+    """Maneja conexiones WebSocket compatibles con el frontend
+
+    El agente se comparte entre conexiones; la ventana anti-bucle es propia de cada conexión.
+    """
+    # Ventana de los últimos mensajes en minúsculas, usada por detect_loop
+    lc_tail = collections.deque(maxlen=LOOP_WINDOW)
 
     # Extraer device_id de los parámetros de query si están disponibles
     device_id = None
     try:
         # Obtener el path de la conexión WebSocket
-        path = websocket.path
-        if '?' in path:
-            from urllib.parse import parse_qs, urlparse
-            parsed = urlparse(path)
-            query_params = parse_qs(parsed.query)
-            device_id = query_params.get('device_id', [None])[0]
+        query = websocket.path.partition('?')[2]
+        if query.startswith('device_id='):
+            # Caso común: device_id es el primer (o único) parámetro
+            device_id = unquote_plus(query[10:].partition('&')[0]) or None
+        elif query:
+            device_id = parse_qs(query).get('device_id', [None])[0]
     except Exception as e:
-        logger.warning(f"Error extrayendo device_id: {e}")
+        logger.warning("Error extrayendo device_id: %s", e)
 
-    logger.info(f"Nueva conexión WebSocket desde {websocket.remote_address} (device_id: {device_id})")
+    logger.info("Nueva conexión WebSocket desde %s (device_id: %s)", websocket.remote_address, device_id)
 
     try:
         async for message in websocket:
             try:
-                data = json.loads(message)
-                logger.info(f"Mensaje recibido: {data.get('type', 'unknown')}")
+                data = json_loads(message)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Mensaje recibido: %s", data.get('type', 'unknown'))
 
                 # Procesar mensaje según el tipo
-                response = await agent.process_message(data, conversation_history)
+                response = await agent.process_message(data, lc_tail)
 
-                # Agregar al historial solo si es una consulta real
+                # Agregar a la ventana anti-bucle solo si es una consulta real
                 if data.get('type') == 'query':
                     user_message = data.get('content', {}).get('text', '')
-                    conversation_history.append({
-                        'role': 'user',
-                        'content': user_message
-                    })
+                    lc_tail.append(str(user_message)[:LOOP_SCAN_CHARS].lower())
 
                     if response.get('type') == 'agent_response':
-                        conversation_history.append({
-                            'role': 'assistant',
-                            'content': response.get('content', {}).get('text', '')
-                        })
+                        assistant_message = response.get('content', {}).get('text', '')
+                        lc_tail.append(str(assistant_message)[:LOOP_SCAN_CHARS].lower())
 
-                # Enviar respuesta
-                await websocket.send(json.dumps(response))
-                logger.info(f"Respuesta enviada: {response.get('type', 'unknown')}")
+                # Enviar respuesta (las respuestas fijas ya vienen serializadas)
+                if isinstance(response, PreserializedResponse):
+                    await websocket.send(response.frame)
+                else:
+                    await websocket.send(json_dumps(response))
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Respuesta enviada: %s", response.get('type', 'unknown'))
 
             except json.JSONDecodeError:
                 error_response = {
@@ -633,7 +828,7 @@ async def handle_websocket(websocket):
                         "message": "Error: Formato de mensaje inválido"
                     }
                 }
-                await websocket.send(json.dumps(error_response))
+                await websocket.send(json_dumps(error_response))
             except Exception as e:
                 logger.error(f"Error procesando mensaje: {e}")
                 error_response = {
@@ -642,7 +837,7 @@ async def handle_websocket(websocket):
                         "message": f"Error interno: {str(e)}"
                     }
                 }
-                await websocket.send(json.dumps(error_response))
+                await websocket.send(json_dumps(error_response))
 
     except websockets.exceptions.ConnectionClosed:
         logger.info("Conexión WebSocket cerrada")
@@ -657,9 +852,24 @@ async def main():
     logger.info(f"🚀 Iniciando servidor II-Agent en {host}:{port}")
     logger.info("✅ Mecanismo anti-bucle activado (límites: 2 búsquedas / 3 planificaciones)")
 
-    async with websockets.serve(handle_websocket, host, port):
-        logger.info(f"✅ Servidor WebSocket ejecutándose en ws://{host}:{port}")
-        await asyncio.Future()  # Ejecutar indefinidamente
+    # Un único agente (cliente Bedrock, sesión HTTP y cachés) para todas las conexiones
+    agent = SimpleIIAgent()
+    handler = functools.partial(handle_websocket, agent=agent)
+
+    try:
+        async with websockets.serve(handler, host, port):
+            logger.info(f"✅ Servidor WebSocket ejecutándose en ws://{host}:{port}")
+            await asyncio.Future()  # Ejecutar indefinidamente
+    finally:
+        await agent.aclose()
 
 if __name__ == "__main__":
+    # Usar uvloop si está disponible (no existe en Windows)
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("✅ Usando uvloop como event loop")
+    except ImportError:
+        pass
+
     asyncio.run(main())
@@ -2,13 +2,22 @@
 Configuración de modelos AWS Bedrock para II-agent.
 """
 
-from typing import Dict, Any
-from dataclasses import dataclass
+import functools
+import sys
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Any, Final, Mapping, Sequence, Tuple
+from dataclasses import dataclass, field
 
+if TYPE_CHECKING:
+    import numpy as np
 
-@dataclass
+
+@dataclass(frozen=True, slots=True, eq=False)
 class BedrockModelConfig:
-    """Configuración para un modelo de Bedrock."""
+    """Configuración inmutable para un modelo de Bedrock.
+
+    Cada modelo tiene una única instancia, por lo que la igualdad es por identidad.
+    """
     model_id: str
     name: str
     provider: str
@@ -18,10 +27,17 @@ class BedrockModelConfig:
     supports_streaming: bool
     cost_per_1k_input_tokens: float
     cost_per_1k_output_tokens: float
+    # Costos por token, derivados de los anteriores para evitar divisiones al estimar
+    cost_per_input_token: float = field(init=False, repr=False, compare=False)
+    cost_per_output_token: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "cost_per_input_token", self.cost_per_1k_input_tokens / 1000.0)
+        object.__setattr__(self, "cost_per_output_token", self.cost_per_1k_output_tokens / 1000.0)
 
 
 # Configuraciones de modelos disponibles en Bedrock
-BEDROCK_MODELS = {
+_BEDROCK_MODELS_RAW = {
     # Claude Models
     "claude-3-7-sonnet": BedrockModelConfig(
         model_id="anthropic.claude-3-7-sonnet-20250219-v1:0",
@@ -129,7 +145,7 @@ BEDROCK_MODELS = {
 }
 
 # Mapeo de aliases para facilitar el uso
-MODEL_ALIASES = {
+_MODEL_ALIASES_RAW = {
     "claude": "claude-3-7-sonnet",  # Usar la versión más reciente por defecto
     "claude-3.7": "claude-3-7-sonnet",
     "claude-sonnet": "claude-3-5-sonnet",
@@ -144,14 +160,50 @@ MODEL_ALIASES = {
     "titan-embeddings": "titan-embed-image",
 }
 
+# Vistas públicas de solo lectura: las tablas derivadas y la caché de get_model_config
+# asumen que estos diccionarios no cambian después de la importación
+BEDROCK_MODELS: Mapping[str, BedrockModelConfig] = MappingProxyType(_BEDROCK_MODELS_RAW)
+MODEL_ALIASES: Mapping[str, str] = MappingProxyType(_MODEL_ALIASES_RAW)
+
+# Tabla de búsqueda precalculada: nombres canónicos y aliases apuntan a la misma configuración.
+# Las claves se internan para que las búsquedas con nombres internados comparen por identidad.
+_RESOLVED: Dict[str, BedrockModelConfig] = {
+    sys.intern(name): config
+    for name, config in (
+        *BEDROCK_MODELS.items(),
+        *((alias, BEDROCK_MODELS[target]) for alias, target in MODEL_ALIASES.items()),
+    )
+}
+
+# Índice de modelos por proveedor, construido una sola vez
+_BY_PROVIDER: Dict[str, Dict[str, BedrockModelConfig]] = {}
+for _name, _config in BEDROCK_MODELS.items():
+    _BY_PROVIDER.setdefault(_config.provider, {})[_name] = _config
+del _name, _config
+
+# _MODEL_INDEX asigna a cada nombre canónico o alias la fila de su modelo en las
+# tarifas columnares de _rate_arrays().
+_CANONICAL_INDEX = {name: i for i, name in enumerate(BEDROCK_MODELS)}
+_MODEL_INDEX: Dict[str, int] = {
+    **_CANONICAL_INDEX,
+    **{alias: _CANONICAL_INDEX[target] for alias, target in MODEL_ALIASES.items()},
+}
+
+# Nombres aceptados, usados en el mensaje de error de get_model_config
+_AVAILABLE_MODELS: Tuple[str, ...] = tuple(BEDROCK_MODELS.keys()) + tuple(MODEL_ALIASES.keys())
+
 # Configuración por defecto - Nova Pro como modelo principal
 DEFAULT_MODEL = "nova-pro"
+DEFAULT_MODEL_CONFIG: Final[BedrockModelConfig] = BEDROCK_MODELS[DEFAULT_MODEL]
 
 
+@functools.lru_cache(maxsize=None)
 def get_model_config(model_name: str) -> BedrockModelConfig:
     """
     Obtiene la configuración de un modelo.
 
+    El resultado se memoiza: las tablas de modelos y aliases son estáticas.
+
     Args:
         model_name: Nombre del modelo o alias
 
@@ -161,24 +213,23 @@ def get_model_config(model_name: str) -> BedrockModelConfig:
     Raises:
         ValueError: Si el modelo no existe
     """
-    # Resolver alias
-    resolved_name = MODEL_ALIASES.get(model_name, model_name)
+    try:
+        return _RESOLVED[model_name]
+    except KeyError:
+        raise ValueError(f"Modelo '{model_name}' no encontrado. Modelos disponibles: {list(_AVAILABLE_MODELS)}") from None
 
-    if resolved_name not in BEDROCK_MODELS:
-        available_models = list(BEDROCK_MODELS.keys()) + list(MODEL_ALIASES.keys())
-        raise ValueError(f"Modelo '{model_name}' no encontrado. Modelos disponibles: {available_models}")
 
-    return BEDROCK_MODELS[resolved_name]
-
-
-def list_available_models() -> Dict[str, BedrockModelConfig]:
+def list_available_models(copy: bool = False) -> Mapping[str, BedrockModelConfig]:
     """
     Lista todos los modelos disponibles.
 
+    Args:
+        copy: Si es True, devuelve un diccionario nuevo que el llamador puede modificar
+
     Returns:
-        Diccionario con todos los modelos disponibles
+        Vista de solo lectura (o copia) con todos los modelos disponibles
     """
-    return BEDROCK_MODELS.copy()
+    return dict(_BEDROCK_MODELS_RAW) if copy else BEDROCK_MODELS
 
 
 def get_model_by_provider(provider: str) -> Dict[str, BedrockModelConfig]:
@@ -191,10 +242,7 @@ def get_model_by_provider(provider: str) -> Dict[str, BedrockModelConfig]:
     Returns:
         Diccionario con modelos del proveedor especificado
     """
-    return {
-        name: config for name, config in BEDROCK_MODELS.items()
-        if config.provider == provider
-    }
+    return _BY_PROVIDER.get(provider, {}).copy()
 
 
 def estimate_cost(
@@ -214,8 +262,78 @@ def estimate_cost(
         Costo estimado en USD
     """
     config = get_model_config(model_name)
+    return input_tokens * config.cost_per_input_token + output_tokens * config.cost_per_output_token
+
+
+@functools.lru_cache(maxsize=1)
+def _rate_arrays() -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Tarifas por token en formato columnar (SoA) para estimaciones multi-modelo.
+
+    Se construyen en el primer uso para no importar numpy al cargar el módulo.
+
+    Returns:
+        Tupla con las tarifas de entrada y de salida, indexadas por _MODEL_INDEX
+    """
+    import numpy as np
 
-    input_cost = (input_tokens / 1000) * config.cost_per_1k_input_tokens
-    output_cost = (output_tokens / 1000) * config.cost_per_1k_output_tokens
+    input_rates = np.array([c.cost_per_input_token for c in BEDROCK_MODELS.values()])
+    output_rates = np.array([c.cost_per_output_token for c in BEDROCK_MODELS.values()])
+    return input_rates, output_rates
+
+
+def estimate_cost_batch(
+    model_name: str,
+    input_tokens: "np.ndarray",
+    output_tokens: "np.ndarray"
+) -> "np.ndarray":
+    """
+    Estima el costo de un lote de consultas a un mismo modelo.
+
+    Args:
+        model_name: Nombre del modelo
+        input_tokens: Tokens de entrada de cada consulta
+        output_tokens: Tokens de salida de cada consulta
+
+    Returns:
+        Costo estimado en USD de cada consulta
+    """
+    import numpy as np
+
+    config = get_model_config(model_name)
+    return (
+        np.asarray(input_tokens) * config.cost_per_input_token
+        + np.asarray(output_tokens) * config.cost_per_output_token
+    )
+
+
+def estimate_costs_multi(
+    model_names: Sequence[str],
+    input_tokens: "np.ndarray",
+    output_tokens: "np.ndarray"
+) -> "np.ndarray":
+    """
+    Estima el costo de un lote de consultas a modelos distintos.
+
+    Args:
+        model_names: Nombre del modelo (o alias) de cada consulta
+        input_tokens: Tokens de entrada de cada consulta
+        output_tokens: Tokens de salida de cada consulta
+
+    Returns:
+        Costo estimado en USD de cada consulta
+
+    Raises:
+        ValueError: Si algún modelo no existe
+    """
+    import numpy as np
 
-    return input_cost + output_cost
+    try:
+        idx = np.fromiter((_MODEL_INDEX[name] for name in model_names), dtype=np.intp, count=len(model_names))
+    except KeyError as e:
+        raise ValueError(f"Modelo '{e.args[0]}' no encontrado. Modelos disponibles: {list(_AVAILABLE_MODELS)}") from None
+    input_rates, output_rates = _rate_arrays()
+    return (
+        input_rates[idx] * np.asarray(input_tokens)
+        + output_rates[idx] * np.asarray(output_tokens)
+    )
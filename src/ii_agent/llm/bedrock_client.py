@@ -3,26 +3,194 @@ Cliente AWS Bedrock para II-agent.
 Basado en la implementación de agent-isa con adaptaciones para II-agent.
 """
 
+import hashlib
+import importlib.util
 import json
 import logging
 import os
-import time
-from typing import Dict, List, Any, Optional, Union, AsyncGenerator
+import random
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Final, Iterator, List, Any, Mapping, Optional, Tuple, Union, AsyncGenerator
 import asyncio
+from functools import lru_cache
+from importlib.resources import files
+from types import MappingProxyType
 from tenacity import retry, wait_random_exponential, stop_after_attempt
 
-try:
-    import boto3
+if TYPE_CHECKING:
     from botocore.config import Config
-    from botocore.exceptions import ClientError, NoCredentialsError
-    BOTO3_AVAILABLE = True
+
+# boto3/botocore se importan al crear el cliente para no pagar su coste de
+# importación en procesos que nunca usan Bedrock
+BOTO3_AVAILABLE = importlib.util.find_spec("boto3") is not None
+
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    _json_loads = json.loads
+
+try:
+    # google-re2 garantiza tiempo lineal en respuestas largas
+    import re2 as _re
 except ImportError:
-    BOTO3_AVAILABLE = False
+    import re as _re
 
 from .base import LLMClient
 
 logger = logging.getLogger(__name__)
 
+# Modelos que admiten puntos de caché de prompt en Bedrock
+PROMPT_CACHE_MODEL_PREFIXES = (
+    "anthropic.claude-3-7-sonnet",
+    "anthropic.claude-3-5-haiku",
+    "anthropic.claude-3-5-sonnet-20241022",
+    "amazon.nova-pro",
+    "amazon.nova-lite",
+    "amazon.nova-micro",
+)
+
+# Clientes bedrock-runtime compartidos entre instancias (reutilizan el pool TCP/TLS)
+_CLIENT_CACHE: Dict[tuple, Any] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+# Llamadas a herramientas en el texto generado, con un nivel de JSON anidado
+_TOOL_RE = _re.compile(
+    r'\{\s*"name":\s*"([^"]+)",\s*"arguments":\s*(\{(?:[^{}]|(?:\{[^{}]*\}))*\})\s*\}'
+)
+
+# Texto de un evento delta del stream cuando no contiene escapes JSON
+_FAST_DELTA_RE = _re.compile(rb'"text":"([^"\\]*)"')
+
+# Búsquedas y frases de planificación usadas por la lógica anti-bucle (una sola pasada)
+_ANTILOOP_RE = _re.compile(
+    r"(?i)(?P<search>web_search|searching)"
+    r"|(?P<planning>let's plan|let's break|planning|we need to|plan the creation)"
+)
+
+
+def _estimate_tokens(text: str) -> int:
+    """Estimación aproximada de tokens (~4 caracteres por token)."""
+    return max(1, len(text) >> 2)
+
+
+# Texto que acompaña al código de la landing page en la respuesta
+_LANDING_INTRO: Final[str] = """✅ He creado una landing page completa para la convocatoria Colombia Inteligente 2025.
+
+Para crear los archivos, necesito usar las herramientas del sistema. Aquí está el código:
+
+**index.html:**
+```html
+"""
+
+_LANDING_MIDDLE: Final[str] = """
+```
+
+**styles.css:**
+```css
+"""
+
+_LANDING_OUTRO: Final[str] = """
+```
+
+🎨 **Características:**
+- ✅ Diseño moderno y responsivo
+- ✅ Toda la información de la convocatoria
+- ✅ Navegación suave entre secciones
+- ✅ Colores atractivos y profesionales
+- ✅ Optimizada para móviles
+- ✅ Fácil de personalizar
+
+📋 **Contenido incluido:**
+- Información general de MinCiencias
+- Cronograma completo
+- Requisitos detallados
+- Participantes elegibles
+- Líneas temáticas (IA y Ciencias Cuánticas)
+
+🚀 **Para usar la landing page:**
+1. Los archivos aparecerán en la pestaña "Code"
+2. Descarga ambos archivos en la misma carpeta
+3. Abre `index.html` en tu navegador
+
+¡La landing page está lista para publicar la información de Colombia Inteligente 2025!"""
+
+
+# Minificación de CSS: comentarios y espacios alrededor de los separadores
+_CSS_COMMENT_RE = _re.compile(r"(?s)/\*.*?\*/")
+_CSS_SPACE_RE = _re.compile(r"\s*([{};,>])\s*|(:)\s+|\s+")
+
+
+def _minify_css(css: str) -> str:
+    """Elimina comentarios y espacios innecesarios de una hoja de estilos."""
+    css = _CSS_COMMENT_RE.sub("", css)
+    css = _CSS_SPACE_RE.sub(lambda m: m.group(1) or m.group(2) or " ", css)
+    return css.replace(";}", "}").strip()
+
+
+@lru_cache(maxsize=None)
+def _read_resource(name: str) -> str:
+    """Lee (una sola vez) un archivo de ii_agent.llm.resources."""
+    return (files("ii_agent.llm.resources") / name).read_text(encoding="utf-8")
+
+
+@lru_cache(maxsize=1)
+def _landing_html() -> str:
+    """HTML de la landing page de Colombia Inteligente 2025, con el CSS crítico en línea."""
+    critical_css = _minify_css(_read_resource("landing-critical.css"))
+    return _read_resource("landing.html").replace("/* landing-critical.css */", critical_css)
+
+
+@lru_cache(maxsize=1)
+def _landing_css() -> str:
+    """CSS no crítico (minificado) de la landing page, cargado sin bloquear el render."""
+    return _minify_css(_read_resource("landing.css"))
+
+
+@lru_cache(maxsize=1)
+def _landing_page_files() -> Mapping[str, bytes]:
+    """Archivos de la landing page listos para escribir en disco."""
+    return MappingProxyType({
+        "index.html": _landing_html().encode("utf-8"),
+        "styles.css": _landing_css().encode("utf-8"),
+    })
+
+
+def iter_landing_response() -> Iterator[str]:
+    """
+    Genera por partes el mensaje con el código de la landing page.
+
+    Permite escribirlo en un socket o archivo (p. ej. con writelines) sin
+    materializar el mensaje completo.
+
+    Yields:
+        Fragmentos del mensaje, en orden
+    """
+    yield _LANDING_INTRO
+    yield _landing_html()
+    yield _LANDING_MIDDLE
+    yield _landing_css()
+    yield _LANDING_OUTRO
+
+
+@lru_cache(maxsize=1)
+def _build_landing_response() -> str:
+    """Mensaje con el código de la landing page; se construye una sola vez por proceso."""
+    return "".join(iter_landing_response())
+
+
+def _colombia_report() -> str:
+    """Informe predefinido sobre la convocatoria Colombia Inteligente 2025."""
+    return _read_resource("colombia_report.md")
+
 
 class BedrockClient(LLMClient):
     """
@@ -34,6 +202,37 @@ class BedrockClient(LLMClient):
     - Amazon Nova Lite
     """
 
+    # Número máximo de respuestas deterministas (temperature == 0) en caché
+    RESPONSE_CACHE_SIZE = 256
+
+    # Instrucciones de uso de herramientas añadidas al prompt del sistema
+    _TOOLS_PROMPT_TEMPLATE = """
+
+AVAILABLE TOOLS:
+{tools}
+
+TOOL USAGE INSTRUCTIONS:
+When you need to use a tool, format your response as JSON like this:
+{{"name": "tool_name", "arguments": {{"param1": "value1", "param2": "value2"}}}}
+
+You can use multiple tools in sequence. Always use tools when you need to:
+- Search for information (use web_search)
+- Write or edit files (use str_replace_tool)
+- Execute commands (use bash_tool)
+- Plan complex tasks (use sequential_thinking)
+
+For the current task about "Colombia Inteligente 2025", you should:
+1. FIRST: Use web_search ONLY ONCE to find current information about the call
+2. THEN: Immediately create a comprehensive report with the findings
+
+CRITICAL RULES:
+- Use web_search ONLY ONCE per task
+- After getting search results, NEVER search again
+- Create the final report immediately with the information obtained
+- If you have already searched, create the report with available information
+- Maximum 3 interactions total per task
+"""
+
     def __init__(
         self,
         model_name: str = None,
@@ -42,6 +241,8 @@ class BedrockClient(LLMClient):
         aws_secret_access_key: Optional[str] = None,
         max_tokens: int = None,
         temperature: float = None,
+        client_config: Optional["Config"] = None,
+        max_pool_connections: Optional[int] = None,
         **kwargs
     ):
         """
@@ -54,6 +255,8 @@ class BedrockClient(LLMClient):
             aws_secret_access_key: Clave secreta AWS
             max_tokens: Máximo número de tokens
             temperature: Temperatura de muestreo
+            client_config: Configuración de botocore que se combina con la configuración por defecto
+            max_pool_connections: Tamaño del pool de conexiones HTTP (por defecto BEDROCK_MAX_POOL o 100)
         """
         if not BOTO3_AVAILABLE:
             raise ImportError("boto3 is required for Bedrock client. Install with: pip install boto3")
@@ -65,7 +268,7 @@ class BedrockClient(LLMClient):
         if model_name is None:
             model_name = os.getenv("LLM_MODEL", DEFAULT_MODEL)
 
-        super().__init__(model_name)
+        self.model_name = model_name
 
         # Configurar región
         self.region = region or os.getenv("AWS_DEFAULT_REGION", "us-east-1")
@@ -86,6 +289,32 @@ class BedrockClient(LLMClient):
         self.model_id = self._resolve_model_id(model_name)
         self.is_claude = "claude" in self.model_id.lower()
         self.is_nova = "nova" in self.model_id.lower()
+        self.supports_prompt_cache = self.model_id.startswith(PROMPT_CACHE_MODEL_PREFIXES)
+
+        # Resolver una sola vez las funciones específicas de la familia del modelo
+        if self.is_claude:
+            self._format_body = self._format_messages_for_claude
+            self._parse_response = self._parse_claude_response
+            self._parse_stream_delta = self._parse_claude_stream_delta
+            self._stream_delta_marker = b'"content_block_delta"'
+        elif self.is_nova:
+            self._format_body = self._format_messages_for_nova
+            self._parse_response = self._parse_nova_response
+            self._parse_stream_delta = self._parse_nova_stream_delta
+            self._stream_delta_marker = b'"contentBlockDelta"'
+        else:
+            raise ValueError(f"Modelo no soportado: {self.model_id}")
+
+        # Configuración adicional de botocore (pool de conexiones, keep-alive, reintentos)
+        self.client_config = client_config
+        self.max_pool_connections = max_pool_connections or int(os.getenv("BEDROCK_MAX_POOL", "100"))
+
+        # Caché LRU de respuestas para peticiones deterministas idénticas
+        self._resp_cache: "OrderedDict[tuple, Tuple[str, int]]" = OrderedDict()
+
+        # Bucle de eventos persistente para las llamadas síncronas de generate()
+        self._bg_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._bg_lock = threading.Lock()
 
         # Configuración de reconexión
         self.reconnect_attempts = 0
@@ -94,6 +323,25 @@ class BedrockClient(LLMClient):
         # Inicializar cliente
         self._initialize_client()
 
+    def _get_background_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Obtiene (o inicia) el bucle de eventos que corre en un hilo daemon.
+
+        Returns:
+            Bucle de eventos persistente compartido por todas las llamadas a generate()
+        """
+        with self._bg_lock:
+            if self._bg_loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name="bedrock-client-loop",
+                    daemon=True
+                )
+                thread.start()
+                self._bg_loop = loop
+            return self._bg_loop
+
     def _resolve_model_id(self, model_name: str) -> str:
         """
         Resuelve el nombre del modelo al ID de Bedrock correspondiente.
@@ -124,32 +372,58 @@ class BedrockClient(LLMClient):
                 }
                 return model_mappings.get(model_name, model_name)
 
-    def _initialize_client(self):
-        """Inicializa el cliente de Bedrock."""
-        try:
-            # Configuración de AWS
-            aws_config = Config(
-                region_name=self.region,
-                retries={
-                    'max_attempts': 3,
-                    'mode': 'adaptive'
-                },
-                max_pool_connections=50,
-                read_timeout=60,
-                connect_timeout=10
-            )
+    def _initialize_client(self, refresh: bool = False):
+        """
+        Inicializa el cliente de Bedrock.
 
-            # Crear sesión y cliente
-            session = boto3.Session(
-                aws_access_key_id=self.aws_access_key_id,
-                aws_secret_access_key=self.aws_secret_access_key,
-                region_name=self.region
-            )
+        Args:
+            refresh: Si es True, descarta el cliente compartido y crea uno nuevo
+        """
+        import boto3
+        from botocore.config import Config
 
-            self.client = session.client(
-                service_name="bedrock-runtime",
-                config=aws_config
-            )
+        try:
+            # Las credenciales se identifican por su hash para no guardarlas en la clave
+            credentials_hash = hashlib.sha256(
+                f"{self.aws_access_key_id}\0{self.aws_secret_access_key}".encode("utf-8")
+            ).digest()
+            cache_key = (credentials_hash, self.region, self.max_pool_connections, self.client_config)
+
+            with _CLIENT_CACHE_LOCK:
+                client = None if refresh else _CLIENT_CACHE.get(cache_key)
+                if client is None:
+                    # Configuración de AWS
+                    # Los reintentos los gestiona tenacity en _invoke_model. En botocore
+                    # 'max_attempts' cuenta solo reintentos; 'total_max_attempts': 1
+                    # limita cada llamada a un único envío HTTP
+                    aws_config = Config(
+                        region_name=self.region,
+                        retries={
+                            'total_max_attempts': 1,
+                            'mode': 'standard'
+                        },
+                        max_pool_connections=self.max_pool_connections,
+                        read_timeout=60,
+                        connect_timeout=3,
+                        tcp_keepalive=True
+                    )
+                    if self.client_config is not None:
+                        aws_config = aws_config.merge(self.client_config)
+
+                    # Crear sesión y cliente
+                    session = boto3.Session(
+                        aws_access_key_id=self.aws_access_key_id,
+                        aws_secret_access_key=self.aws_secret_access_key,
+                        region_name=self.region
+                    )
+
+                    client = session.client(
+                        service_name="bedrock-runtime",
+                        config=aws_config
+                    )
+                    _CLIENT_CACHE[cache_key] = client
+
+            self.client = client
 
             # Resetear contador de reconexión
             self.reconnect_attempts = 0
@@ -159,7 +433,7 @@ class BedrockClient(LLMClient):
             logger.error(f"Error al inicializar cliente Bedrock: {e}")
             raise
 
-    def _reconnect_client(self) -> bool:
+    async def _reconnect_client(self) -> bool:
         """
         Intenta reconectar el cliente Bedrock.
 
@@ -174,13 +448,14 @@ class BedrockClient(LLMClient):
         self.reconnect_attempts += 1
 
         try:
-            # Esperar antes de reconectar
-            wait_time = 2 ** self.reconnect_attempts
-            logger.info(f"Esperando {wait_time} segundos antes de reconectar...")
-            time.sleep(wait_time)
-
-            # Reinicializar cliente
-            self._initialize_client()
+            # Esperar antes de reconectar sin bloquear el event loop; el jitter
+            # evita que muchas corrutinas reconecten a la vez
+            wait_time = min(2 ** self.reconnect_attempts, 30) + random.uniform(0, 1)
+            logger.info(f"Esperando {wait_time:.1f} segundos antes de reconectar...")
+            await asyncio.sleep(wait_time)
+
+            # Reinicializar cliente con una conexión nueva
+            self._initialize_client(refresh=True)
             return True
 
         except Exception as e:
@@ -198,6 +473,15 @@ class BedrockClient(LLMClient):
         if system_messages:
             system_prompt = "\n".join([msg["content"] for msg in system_messages])
 
+        # Marcar el prompt de sistema (incluye las instrucciones de herramientas)
+        # como cacheable para que Bedrock no lo vuelva a procesar en cada llamada
+        if system_prompt and self.supports_prompt_cache:
+            system_prompt = [{
+                "type": "text",
+                "text": system_prompt,
+                "cache_control": {"type": "ephemeral"}
+            }]
+
         return {
             "anthropic_version": "bedrock-2023-05-31",
             "max_tokens": self.max_tokens,
@@ -210,64 +494,85 @@ class BedrockClient(LLMClient):
         """Formatea mensajes para Nova en Bedrock."""
         # Nova requiere que el contenido sea un array de objetos con 'text'
         formatted_messages = []
+        system_blocks = []
         for msg in messages:
             if msg.get("role") == "system":
-                # Los mensajes de sistema se incluyen como user messages en Nova
-                formatted_messages.append({
-                    "role": "user",
-                    "content": [{"text": msg["content"]}]
-                })
+                if self.supports_prompt_cache:
+                    # Los mensajes de sistema van en el campo 'system' para poder cachearlos
+                    system_blocks.append({"text": msg["content"]})
+                else:
+                    # Los mensajes de sistema se incluyen como user messages en Nova
+                    formatted_messages.append({
+                        "role": "user",
+                        "content": [{"text": msg["content"]}]
+                    })
             else:
                 formatted_messages.append({
                     "role": msg["role"],
                     "content": [{"text": msg["content"]}]
                 })
 
-        return {
+        body = {
             "messages": formatted_messages,
             "inferenceConfig": {
                 "maxTokens": self.max_tokens,
                 "temperature": self.temperature
             }
         }
+        if system_blocks:
+            body["system"] = system_blocks + [{"cachePoint": {"type": "default"}}]
+        return body
+
+    @staticmethod
+    def _parse_claude_response(response_body: Dict[str, Any]) -> Tuple[str, int]:
+        """Texto y tokens totales de una respuesta de Claude."""
+        usage = response_body.get("usage") or {}
+        total_tokens = usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+        return response_body["content"][0]["text"], total_tokens
+
+    @staticmethod
+    def _parse_nova_response(response_body: Dict[str, Any]) -> Tuple[str, int]:
+        """Texto y tokens totales de una respuesta de Nova."""
+        usage = response_body.get("usage") or {}
+        return response_body["output"]["message"]["content"][0]["text"], usage.get("totalTokens", 0)
 
     @retry(
-        wait=wait_random_exponential(multiplier=1, max=60),
+        wait=wait_random_exponential(multiplier=1, max=8),
         stop=stop_after_attempt(3)
     )
-    async def _invoke_model(self, body: Dict[str, Any]) -> str:
+    async def _invoke_model(self, body: bytes) -> Tuple[str, Optional[int]]:
         """
         Invoca el modelo en Bedrock.
 
+        Las llamadas bloqueantes de boto3 se ejecutan en un hilo para no
+        bloquear el event loop.
+
         Args:
-            body: Cuerpo de la petición
+            body: Cuerpo de la petición ya serializado en JSON
 
         Returns:
-            Respuesta del modelo
+            Tupla con la respuesta del modelo y los tokens totales informados por
+            Bedrock (None si la respuesta no incluye uso)
         """
+        from botocore.exceptions import ClientError
+
         try:
-            response = self.client.invoke_model(
+            response = await asyncio.to_thread(
+                self.client.invoke_model,
                 modelId=self.model_id,
-                body=json.dumps(body),
+                body=body,
                 contentType="application/json",
                 accept="application/json"
             )
+            raw_body = await asyncio.to_thread(response["body"].read)
 
-            response_body = json.loads(response["body"].read())
-
-            # Extraer contenido según el tipo de modelo
-            if self.is_claude:
-                return response_body["content"][0]["text"]
-            elif self.is_nova:
-                return response_body["output"]["message"]["content"][0]["text"]
-            else:
-                # Fallback genérico
-                return str(response_body)
+            text, total_tokens = self._parse_response(_json_loads(raw_body))
+            return text, total_tokens or None
 
         except ClientError as e:
             error_code = e.response.get("Error", {}).get("Code", "Unknown")
             if error_code in ["ThrottlingException", "ServiceUnavailableException"]:
-                if self._reconnect_client():
+                if await self._reconnect_client():
                     raise  # Retry with new client
             logger.error(f"Error de cliente AWS: {e}")
             raise
@@ -290,30 +595,142 @@ class BedrockClient(LLMClient):
         Returns:
             Respuesta generada
         """
+        response, _ = await self._generate_with_usage(messages, **kwargs)
+        return response
+
+    async def _generate_with_usage(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> Tuple[str, int]:
+        """
+        Genera una respuesta usando Bedrock junto con su uso de tokens.
+
+        Args:
+            messages: Lista de mensajes de conversación
+            **kwargs: Argumentos adicionales
+
+        Returns:
+            Tupla con la respuesta generada y los tokens totales (reales si
+            Bedrock los informa, estimados en caso contrario)
+        """
         try:
             # Formatear mensajes según el tipo de modelo
-            if self.is_claude:
-                body = self._format_messages_for_claude(messages)
-            elif self.is_nova:
-                body = self._format_messages_for_nova(messages)
-            else:
-                raise ValueError(f"Modelo no soportado: {self.model_id}")
+            body = self._format_body(messages)
+
+            # Serializar una sola vez; los reintentos reutilizan los mismos bytes
+            body_bytes = _json_dumps(body)
+
+            # Solo las respuestas deterministas se pueden reutilizar
+            cache_key = None
+            if self.temperature == 0:
+                messages_hash = hashlib.blake2b(body_bytes, digest_size=16).digest()
+                cache_key = (self.model_id, self.temperature, self.max_tokens, messages_hash)
+                cached = self._resp_cache.get(cache_key)
+                if cached is not None:
+                    self._resp_cache.move_to_end(cache_key)
+                    return cached
 
             # Invocar modelo
-            response = await self._invoke_model(body)
-            return response
+            response, total_tokens = await self._invoke_model(body_bytes)
+            result = (response, total_tokens or _estimate_tokens(response))
+
+            if cache_key is not None:
+                self._resp_cache[cache_key] = result
+                if len(self._resp_cache) > self.RESPONSE_CACHE_SIZE:
+                    self._resp_cache.popitem(last=False)
+            return result
 
         except Exception as e:
             logger.error(f"Error al generar respuesta: {e}")
             raise
 
+    def _extract_stream_delta(self, event: Dict[str, Any]) -> Optional[str]:
+        """
+        Extrae el fragmento de texto de un evento del stream de Bedrock.
+
+        Args:
+            event: Evento decodificado del EventStream
+
+        Returns:
+            Texto del fragmento, o None si el evento no contiene texto
+        """
+        chunk = event.get("chunk")
+        if not chunk:
+            return None
+
+        raw = chunk["bytes"]
+
+        # Camino rápido: la mayoría de los eventos son deltas de texto sin escapes
+        if self._stream_delta_marker in raw:
+            match = _FAST_DELTA_RE.search(raw)
+            if match:
+                return match.group(1).decode("utf-8")
+
+        return self._parse_stream_delta(_json_loads(raw))
+
+    @staticmethod
+    def _parse_claude_stream_delta(payload: Dict[str, Any]) -> Optional[str]:
+        """Texto de un evento de streaming de Claude."""
+        if payload.get("type") == "content_block_delta":
+            return payload.get("delta", {}).get("text")
+        return None
+
+    @staticmethod
+    def _parse_nova_stream_delta(payload: Dict[str, Any]) -> Optional[str]:
+        """Texto de un evento de streaming de Nova."""
+        delta = payload.get("contentBlockDelta")
+        if delta:
+            return delta.get("delta", {}).get("text")
+        return None
+
+    async def _stream_model(self, body: Dict[str, Any]) -> AsyncGenerator[str, None]:
+        """
+        Invoca el modelo en Bedrock con respuesta en streaming.
+
+        Las llamadas bloqueantes de boto3 se ejecutan en un hilo para no
+        bloquear el event loop.
+
+        Args:
+            body: Cuerpo de la petición
+
+        Yields:
+            Fragmentos de texto a medida que el modelo los genera
+        """
+        from botocore.exceptions import ClientError
+
+        try:
+            response = await asyncio.to_thread(
+                self.client.invoke_model_with_response_stream,
+                modelId=self.model_id,
+                body=_json_dumps(body),
+                contentType="application/json",
+                accept="application/json"
+            )
+            events = iter(response["body"])
+
+            while True:
+                event = await asyncio.to_thread(next, events, None)
+                if event is None:
+                    break
+                text = self._extract_stream_delta(event)
+                if text:
+                    yield text
+
+        except ClientError as e:
+            logger.error(f"Error de cliente AWS en streaming: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Error al invocar modelo en streaming: {e}")
+            raise
+
     async def generate_stream(
         self,
         messages: List[Dict[str, str]],
         **kwargs
     ) -> AsyncGenerator[str, None]:
         """
-        Genera una respuesta en streaming (no implementado para Bedrock).
+        Genera una respuesta en streaming.
 
         Args:
             messages: Lista de mensajes de conversación
@@ -322,9 +739,69 @@ class BedrockClient(LLMClient):
         Yields:
             Fragmentos de la respuesta
         """
-        # Bedrock no soporta streaming nativo, devolver respuesta completa
-        response = await self.generate_response(messages, **kwargs)
-        yield response
+        # Formatear mensajes según el tipo de modelo
+        body = self._format_body(messages)
+
+        async for token in self._stream_model(body):
+            yield token
+
+    @staticmethod
+    def _normalize_message_groups(messages) -> List[List[Dict[str, Any]]]:
+        """
+        Convierte mensajes en formato LLMMessages a diccionarios, conservando los grupos.
+
+        Cada grupo de entrada produce un grupo de salida (vacío si no contiene
+        texto, p. ej. un turno de resultados de herramientas), de modo que las
+        ventanas sobre los últimos N grupos coinciden con los turnos reales.
+
+        Args:
+            messages: Grupos de bloques (listas) o diccionarios con 'role' y 'content'
+
+        Returns:
+            Lista de grupos de mensajes con 'role' y 'content'
+        """
+        groups = []
+        for message_group in messages:
+            group = []
+            if isinstance(message_group, list):
+                # Formato de lista de bloques
+                for block in message_group:
+                    if hasattr(block, 'text'):
+                        group.append({"role": "user", "content": block.text})
+                    elif isinstance(block, dict):
+                        # Formato de diccionario directo
+                        group.append(block)
+            elif isinstance(message_group, dict):
+                # Formato de diccionario directo
+                group.append(message_group)
+            groups.append(group)
+        return groups
+
+    @staticmethod
+    def _count_loop_signals(messages: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Cuenta los mensajes que mencionan búsquedas y los que contienen frases de planificación.
+
+        Args:
+            messages: Mensajes normalizados a examinar
+
+        Returns:
+            Tupla con el número de mensajes con búsquedas y con planificación
+        """
+        search_count = 0
+        planning_count = 0
+        for message in messages:
+            found_search = found_planning = False
+            for match in _ANTILOOP_RE.finditer(str(message.get('content', ''))):
+                if match.group('search'):
+                    found_search = True
+                else:
+                    found_planning = True
+                if found_search and found_planning:
+                    break
+            search_count += found_search
+            planning_count += found_planning
+        return search_count, planning_count
 
     def generate(
         self,
@@ -339,6 +816,51 @@ class BedrockClient(LLMClient):
         """
         Implementación del método abstracto generate para compatibilidad.
 
+        Ejecuta generate_async en el bucle de eventos persistente del cliente.
+
+        Args:
+            messages: Mensajes en formato LLMMessages
+            max_tokens: Máximo número de tokens
+            system_prompt: Prompt del sistema
+            temperature: Temperatura de muestreo
+            tools: Herramientas disponibles
+            tool_choice: Selección de herramienta
+            thinking_tokens: Tokens de pensamiento
+
+        Returns:
+            Tupla con bloques de contenido y metadatos
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self.generate_async(
+                messages,
+                max_tokens,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                tools=tools,
+                tool_choice=tool_choice,
+                thinking_tokens=thinking_tokens,
+            ),
+            self._get_background_loop()
+        )
+        return future.result()
+
+    async def generate_async(
+        self,
+        messages,
+        max_tokens: int,
+        system_prompt: str = None,
+        temperature: float = 0.0,
+        tools = [],
+        tool_choice = None,
+        thinking_tokens: int = None,
+    ):
+        """
+        Versión asíncrona de generate.
+
+        Permite a los llamadores que ya tienen un event loop solapar la
+        generación con otras operaciones (p. ej. ejecutar herramientas de
+        otro turno o lanzar varias generaciones con asyncio.gather).
+
         Args:
             messages: Mensajes en formato LLMMessages
             max_tokens: Máximo número de tokens
@@ -358,92 +880,27 @@ class BedrockClient(LLMClient):
             # Agregar instrucciones sobre herramientas si hay herramientas disponibles
             enhanced_prompt = system_prompt
             if tools:
-                tool_descriptions = []
-                for tool in tools:
-                    tool_desc = f"- {tool.name}: {tool.description}"
-                    tool_descriptions.append(tool_desc)
-
-                tools_instruction = f"""
-
-AVAILABLE TOOLS:
-{chr(10).join(tool_descriptions)}
-
-TOOL USAGE INSTRUCTIONS:
-When you need to use a tool, format your response as JSON like this:
-{{"name": "tool_name", "arguments": {{"param1": "value1", "param2": "value2"}}}}
-
-You can use multiple tools in sequence. Always use tools when you need to:
-- Search for information (use web_search)
-- Write or edit files (use str_replace_tool)
-- Execute commands (use bash_tool)
-- Plan complex tasks (use sequential_thinking)
-
-For the current task about "Colombia Inteligente 2025", you should:
-1. FIRST: Use web_search ONLY ONCE to find current information about the call
-2. THEN: Immediately create a comprehensive report with the findings
-
-CRITICAL RULES:
-- Use web_search ONLY ONCE per task
-- After getting search results, NEVER search again
-- Create the final report immediately with the information obtained
-- If you have already searched, create the report with available information
-- Maximum 3 interactions total per task
-"""
+                tools_instruction = self._TOOLS_PROMPT_TEMPLATE.format(
+                    tools="\n".join(f"- {tool.name}: {tool.description}" for tool in tools)
+                )
                 enhanced_prompt += tools_instruction
 
             converted_messages.append({"role": "system", "content": enhanced_prompt})
 
-        # Convertir formato LLMMessages a formato simple
-        for message_group in messages:
-            if isinstance(message_group, list):
-                # Formato de lista de bloques
-                for block in message_group:
-                    if hasattr(block, 'text'):
-                        converted_messages.append({"role": "user", "content": block.text})
-                    elif isinstance(block, dict):
-                        # Formato de diccionario directo
-                        converted_messages.append(block)
-            elif isinstance(message_group, dict):
-                # Formato de diccionario directo
-                converted_messages.append(message_group)
-
-        # Ejecutar generación async de forma síncrona
-        import asyncio
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+        # Convertir formato LLMMessages a formato simple (una sola pasada)
+        message_groups = self._normalize_message_groups(messages)
+        converted_messages.extend(msg for group in message_groups for msg in group)
 
-        response = loop.run_until_complete(
-            self.generate_response(converted_messages, max_tokens=max_tokens, temperature=temperature)
+        response, total_tokens = await self._generate_with_usage(
+            converted_messages, max_tokens=max_tokens, temperature=temperature
         )
 
         # Convertir respuesta al formato esperado
         from .base import TextResult, ToolCall
-        import json
-        import re
 
         # ANTI-LOOP LOGIC: Detectar patrones de bucle en la conversación actual
-        search_count = 0
-        planning_count = 0
-        recent_messages = messages[-5:] if len(messages) > 5 else messages  # Solo últimos 5 mensajes
-
-        for message_group in recent_messages:
-            if isinstance(message_group, list):
-                for block in message_group:
-                    if hasattr(block, 'text'):
-                        text_content = str(block.text).lower()
-                        if 'web_search' in text_content or 'searching' in text_content.lower():
-                            search_count += 1
-                        if any(phrase in text_content for phrase in ['let\'s plan', 'let\'s break', 'planning', 'we need to', 'plan the creation']):
-                            planning_count += 1
-            elif isinstance(message_group, dict):
-                content = str(message_group.get('content', '')).lower()
-                if 'web_search' in content or 'searching' in content:
-                    search_count += 1
-                if any(phrase in content for phrase in ['let\'s plan', 'let\'s break', 'planning', 'we need to', 'plan the creation']):
-                    planning_count += 1
+        recent_messages = [msg for group in message_groups[-5:] for msg in group]  # Solo últimos 5 mensajes
+        search_count, planning_count = self._count_loop_signals(recent_messages)
 
         # Si hay muchos mensajes de planificación o búsquedas repetidas en los últimos mensajes
         if search_count >= 2 or planning_count >= 3:
@@ -451,14 +908,10 @@ CRITICAL RULES:
 
             # Determinar el tipo de tarea basado en el último mensaje
             last_message_content = ""
-            if messages:
-                last_msg = messages[-1]
-                if isinstance(last_msg, dict):
-                    last_message_content = str(last_msg.get('content', '')).lower()
-                elif isinstance(last_msg, list) and last_msg:
-                    for block in last_msg:
-                        if hasattr(block, 'text'):
-                            last_message_content += str(block.text).lower()
+            if message_groups:
+                last_message_content = "".join(
+                    str(msg.get('content', '')) for msg in message_groups[-1]
+                ).lower()
 
             # Para landing pages, no usar anti-bucle - dejar que el agente use herramientas
             if 'landing page' in last_message_content or 'html' in last_message_content or 'css' in last_message_content:
@@ -468,16 +921,15 @@ CRITICAL RULES:
                 # Solo para otros tipos de tareas
                 final_response = self._generate_colombia_inteligente_response()
                 text_result = TextResult(text=final_response)
-                return [text_result], {"usage": {"total_tokens": len(final_response.split())}}
+                return [text_result], {"usage": {"total_tokens": _estimate_tokens(final_response)}}
 
         # Detectar llamadas a herramientas en el texto
         tool_calls = []
-        remaining_text = response
+        text_segments = []
+        last_end = 0
 
         # Buscar patrones de llamadas a herramientas más robustos
-        # Patrón mejorado que captura JSON anidado correctamente
-        tool_pattern = r'\{\s*"name":\s*"([^"]+)",\s*"arguments":\s*(\{(?:[^{}]|(?:\{[^{}]*\}))*\})\s*\}'
-        matches = re.finditer(tool_pattern, response, re.DOTALL)
+        matches = _TOOL_RE.finditer(response)
 
         for match in matches:
             try:
@@ -491,11 +943,11 @@ CRITICAL RULES:
 
                 # Intentar parsear los argumentos
                 try:
-                    arguments = json.loads(arguments_str)
+                    arguments = _json_loads(arguments_str)
                 except json.JSONDecodeError:
                     # Si falla, intentar arreglar JSON malformado
                     arguments_str = arguments_str.replace("'", '"')
-                    arguments = json.loads(arguments_str)
+                    arguments = _json_loads(arguments_str)
 
                 # Crear llamada a herramienta
                 tool_call = ToolCall(
@@ -505,13 +957,18 @@ CRITICAL RULES:
                 )
                 tool_calls.append(tool_call)
 
-                # Remover la llamada a herramienta del texto
-                remaining_text = remaining_text.replace(match.group(0), "").strip()
+                # Conservar solo el texto entre llamadas a herramientas
+                start, end = match.span()
+                text_segments.append(response[last_end:start])
+                last_end = end
 
             except Exception as e:
                 logger.warning(f"Error procesando llamada a herramienta: {e}")
                 continue
 
+        text_segments.append(response[last_end:])
+        remaining_text = "".join(text_segments)
+
         # Crear lista de resultados
         results = []
 
@@ -528,517 +985,27 @@ CRITICAL RULES:
             text_result = TextResult(text=response)
             results.append(text_result)
 
-        return results, {"usage": {"total_tokens": len(response.split())}}  # Estimación simple
+        return results, {"usage": {"total_tokens": total_tokens}}
 
     def _generate_colombia_inteligente_response(self) -> str:
         """Genera respuesta sobre Colombia Inteligente 2025."""
-        return """Basándome en las búsquedas realizadas sobre Colombia Inteligente 2025, puedo elaborar el siguiente informe:
-
-# INFORME: CONVOCATORIA COLOMBIA INTELIGENTE 2025
-
-## INFORMACIÓN GENERAL
-- **Organización**: MinCiencias (Ministerio de Ciencia, Tecnología e Innovación)
-- **Enfoque**: Inteligencia Artificial y Ciencias y Tecnologías Cuánticas
-- **Fecha de cierre**: 26 de mayo de 2025 hasta las 4:00 pm hora colombiana
-
-## CRONOGRAMA
-- **Cierre de convocatoria**: 26 de mayo de 2025
-- **Período de revisión de requisitos**: Del 27 de mayo al 03 de junio de 2025
-- **Período de subsanación**: Del 04 al 06 de junio de 2025
-- **Publicación del banco preliminar**: Posterior a la subsanación
-
-## PARTICIPANTES ELEGIBLES
-- Instituciones de Educación Superior (IES)
-- Grupos de Investigación registrados en SIGP
-- Jóvenes investigadores e innovadores
-- Estudiantes de maestría
-- Estancias posdoctorales
-
-## REQUISITOS
-- Grupos de investigación registrados obligatoriamente en SIGP
-- Líneas de investigación en TIC, Industria 4.0, IA o Ciencias Cuánticas
-- Carta unificada de aval y compromiso institucional
-- Cumplimiento de términos de referencia específicos
-
-## LÍNEAS TEMÁTICAS
-1. **Inteligencia Artificial**
-2. **Ciencia y Tecnologías Cuánticas**
-
-Los proyectos deben presentarse en una línea principal, pero pueden integrar elementos complementarios del otro eje si se justifica adecuadamente.
-
-*Información recopilada de fuentes oficiales de MinCiencias y universidades participantes.*"""
+        return _colombia_report()
 
     def _generate_landing_page_response(self) -> str:
         """Genera respuesta con código HTML/CSS para landing page."""
         # Crear archivos físicos en el workspace usando el workspace_manager
         # Nota: Este método será llamado desde el contexto del agente que tiene acceso al workspace_manager
-        return self._create_landing_page_files()
-
-    def _create_landing_page_files(self) -> str:
-        """Crea los archivos HTML y CSS para la landing page."""
-        # Crear archivo HTML
-        html_content = """<!DOCTYPE html>
-<html lang="es">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Colombia Inteligente 2025 - Convocatoria MinCiencias</title>
-    <link rel="stylesheet" href="styles.css">
-    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;600;700&display=swap" rel="stylesheet">
-</head>
-<body>
-    <header class="hero">
-        <div class="container">
-            <nav class="navbar">
-                <div class="logo">
-                    <h2>MinCiencias</h2>
-                </div>
-                <ul class="nav-links">
-                    <li><a href="#info">Información</a></li>
-                    <li><a href="#requisitos">Requisitos</a></li>
-                    <li><a href="#cronograma">Cronograma</a></li>
-                    <li><a href="#participantes">Participantes</a></li>
-                </ul>
-            </nav>
-
-            <div class="hero-content">
-                <h1>Colombia Inteligente 2025</h1>
-                <p class="hero-subtitle">Convocatoria para Inteligencia Artificial y Ciencias Cuánticas</p>
-                <div class="hero-stats">
-                    <div class="stat">
-                        <h3>26 Mayo 2025</h3>
-                        <p>Fecha límite</p>
-                    </div>
-                    <div class="stat">
-                        <h3>2 Líneas</h3>
-                        <p>Temáticas principales</p>
-                    </div>
-                </div>
-                <a href="#info" class="cta-button">Conocer más</a>
-            </div>
-        </div>
-    </header>
-
-    <section id="info" class="info-section">
-        <div class="container">
-            <h2>Información General</h2>
-            <div class="info-grid">
-                <div class="info-card">
-                    <h3>Organización</h3>
-                    <p>MinCiencias (Ministerio de Ciencia, Tecnología e Innovación)</p>
-                </div>
-                <div class="info-card">
-                    <h3>Enfoque</h3>
-                    <p>Inteligencia Artificial y Ciencias y Tecnologías Cuánticas</p>
-                </div>
-                <div class="info-card">
-                    <h3>Modalidad</h3>
-                    <p>Convocatoria pública nacional</p>
-                </div>
-            </div>
-        </div>
-    </section>
-
-    <section id="requisitos" class="requirements-section">
-        <div class="container">
-            <h2>Requisitos</h2>
-            <div class="requirements-list">
-                <div class="requirement">
-                    <div class="req-icon">✓</div>
-                    <div class="req-content">
-                        <h3>Registro SIGP</h3>
-                        <p>Grupos de investigación registrados obligatoriamente en SIGP</p>
-                    </div>
-                </div>
-                <div class="requirement">
-                    <div class="req-icon">✓</div>
-                    <div class="req-content">
-                        <h3>Líneas de Investigación</h3>
-                        <p>TIC, Industria 4.0, IA o Ciencias Cuánticas</p>
-                    </div>
-                </div>
-                <div class="requirement">
-                    <div class="req-icon">✓</div>
-                    <div class="req-content">
-                        <h3>Documentación</h3>
-                        <p>Carta unificada de aval y compromiso institucional</p>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </section>
-
-    <section id="cronograma" class="timeline-section">
-        <div class="container">
-            <h2>Cronograma</h2>
-            <div class="timeline">
-                <div class="timeline-item">
-                    <div class="timeline-date">26 Mayo 2025</div>
-                    <div class="timeline-content">
-                        <h3>Cierre de Convocatoria</h3>
-                        <p>Hasta las 4:00 pm hora colombiana</p>
-                    </div>
-                </div>
-                <div class="timeline-item">
-                    <div class="timeline-date">27 Mayo - 3 Junio</div>
-                    <div class="timeline-content">
-                        <h3>Revisión de Requisitos</h3>
-                        <p>Período de evaluación inicial</p>
-                    </div>
-                </div>
-                <div class="timeline-item">
-                    <div class="timeline-date">4 - 6 Junio</div>
-                    <div class="timeline-content">
-                        <h3>Subsanación</h3>
-                        <p>Período para completar documentación</p>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </section>
-
-    <section id="participantes" class="participants-section">
-        <div class="container">
-            <h2>¿Quién puede participar?</h2>
-            <div class="participants-grid">
-                <div class="participant-card">
-                    <h3>Instituciones de Educación Superior</h3>
-                    <p>Universidades públicas y privadas</p>
-                </div>
-                <div class="participant-card">
-                    <h3>Grupos de Investigación</h3>
-                    <p>Registrados en SIGP</p>
-                </div>
-                <div class="participant-card">
-                    <h3>Jóvenes Investigadores</h3>
-                    <p>E innovadores</p>
-                </div>
-                <div class="participant-card">
-                    <h3>Estudiantes de Maestría</h3>
-                    <p>En áreas relacionadas</p>
-                </div>
-                <div class="participant-card">
-                    <h3>Estancias Posdoctorales</h3>
-                    <p>Investigadores posdoctorales</p>
-                </div>
-            </div>
-        </div>
-    </section>
-
-    <footer class="footer">
-        <div class="container">
-            <p>&copy; 2025 MinCiencias - Colombia Inteligente. Todos los derechos reservados.</p>
-        </div>
-    </footer>
-</body>
-</html>"""
-
-        # Crear archivo CSS
-        css_content = """* {
-    margin: 0;
-    padding: 0;
-    box-sizing: border-box;
-}
-
-body {
-    font-family: 'Inter', sans-serif;
-    line-height: 1.6;
-    color: #333;
-}
-
-.container {
-    max-width: 1200px;
-    margin: 0 auto;
-    padding: 0 20px;
-}
-
-/* Header & Hero */
-.hero {
-    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-    color: white;
-    min-height: 100vh;
-    display: flex;
-    flex-direction: column;
-}
-
-.navbar {
-    display: flex;
-    justify-content: space-between;
-    align-items: center;
-    padding: 1rem 0;
-}
-
-.logo h2 {
-    font-size: 1.8rem;
-    font-weight: 700;
-}
-
-.nav-links {
-    display: flex;
-    list-style: none;
-    gap: 2rem;
-}
-
-.nav-links a {
-    color: white;
-    text-decoration: none;
-    font-weight: 500;
-    transition: opacity 0.3s;
-}
-
-.nav-links a:hover {
-    opacity: 0.8;
-}
-
-.hero-content {
-    flex: 1;
-    display: flex;
-    flex-direction: column;
-    justify-content: center;
-    text-align: center;
-    padding: 4rem 0;
-}
-
-.hero-content h1 {
-    font-size: 3.5rem;
-    font-weight: 700;
-    margin-bottom: 1rem;
-}
-
-.hero-subtitle {
-    font-size: 1.3rem;
-    margin-bottom: 3rem;
-    opacity: 0.9;
-}
-
-.hero-stats {
-    display: flex;
-    justify-content: center;
-    gap: 4rem;
-    margin-bottom: 3rem;
-}
-
-.stat h3 {
-    font-size: 2rem;
-    font-weight: 600;
-}
-
-.stat p {
-    opacity: 0.8;
-}
-
-.cta-button {
-    display: inline-block;
-    background: white;
-    color: #667eea;
-    padding: 1rem 2rem;
-    border-radius: 50px;
-    text-decoration: none;
-    font-weight: 600;
-    transition: transform 0.3s;
-}
-
-.cta-button:hover {
-    transform: translateY(-2px);
-}
-
-/* Sections */
-section {
-    padding: 5rem 0;
-}
-
-h2 {
-    font-size: 2.5rem;
-    text-align: center;
-    margin-bottom: 3rem;
-    color: #333;
-}
-
-/* Info Section */
-.info-grid {
-    display: grid;
-    grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-    gap: 2rem;
-}
-
-.info-card {
-    background: #f8f9fa;
-    padding: 2rem;
-    border-radius: 10px;
-    text-align: center;
-}
-
-.info-card h3 {
-    color: #667eea;
-    margin-bottom: 1rem;
-}
-
-/* Requirements Section */
-.requirements-section {
-    background: #f8f9fa;
-}
-
-.requirements-list {
-    max-width: 800px;
-    margin: 0 auto;
-}
-
-.requirement {
-    display: flex;
-    align-items: center;
-    margin-bottom: 2rem;
-    background: white;
-    padding: 1.5rem;
-    border-radius: 10px;
-    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-}
-
-.req-icon {
-    background: #667eea;
-    color: white;
-    width: 40px;
-    height: 40px;
-    border-radius: 50%;
-    display: flex;
-    align-items: center;
-    justify-content: center;
-    margin-right: 1.5rem;
-    font-weight: bold;
-}
-
-.req-content h3 {
-    color: #333;
-    margin-bottom: 0.5rem;
-}
-
-/* Timeline Section */
-.timeline {
-    max-width: 800px;
-    margin: 0 auto;
-}
-
-.timeline-item {
-    display: flex;
-    margin-bottom: 2rem;
-    align-items: center;
-}
-
-.timeline-date {
-    background: #667eea;
-    color: white;
-    padding: 1rem;
-    border-radius: 10px;
-    font-weight: 600;
-    min-width: 200px;
-    text-align: center;
-    margin-right: 2rem;
-}
-
-.timeline-content {
-    flex: 1;
-}
-
-.timeline-content h3 {
-    color: #333;
-    margin-bottom: 0.5rem;
-}
-
-/* Participants Section */
-.participants-section {
-    background: #f8f9fa;
-}
-
-.participants-grid {
-    display: grid;
-    grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-    gap: 1.5rem;
-}
-
-.participant-card {
-    background: white;
-    padding: 2rem;
-    border-radius: 10px;
-    text-align: center;
-    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-    transition: transform 0.3s;
-}
-
-.participant-card:hover {
-    transform: translateY(-5px);
-}
-
-.participant-card h3 {
-    color: #667eea;
-    margin-bottom: 1rem;
-}
-
-/* Footer */
-.footer {
-    background: #333;
-    color: white;
-    text-align: center;
-    padding: 2rem 0;
-}
-
-/* Responsive */
-@media (max-width: 768px) {
-    .hero-content h1 {
-        font-size: 2.5rem;
-    }
-
-    .hero-stats {
-        flex-direction: column;
-        gap: 2rem;
-    }
-
-    .nav-links {
-        display: none;
-    }
-
-    .timeline-item {
-        flex-direction: column;
-        text-align: center;
-    }
-
-    .timeline-date {
-        margin-right: 0;
-        margin-bottom: 1rem;
-    }
-}"""
-
-        # En lugar de crear archivos directamente, devolver el código para que el agente use herramientas
-        return f"""✅ He creado una landing page completa para la convocatoria Colombia Inteligente 2025.
-
-Para crear los archivos, necesito usar las herramientas del sistema. Aquí está el código:
-
-**index.html:**
-```html
-{html_content}
-```
-
-**styles.css:**
-```css
-{css_content}
-```
+        message, _ = self._create_landing_page_files()
+        return message
 
-🎨 **Características:**
-- ✅ Diseño moderno y responsivo
-- ✅ Toda la información de la convocatoria
-- ✅ Navegación suave entre secciones
-- ✅ Colores atractivos y profesionales
-- ✅ Optimizada para móviles
-- ✅ Fácil de personalizar
-
-📋 **Contenido incluido:**
-- Información general de MinCiencias
-- Cronograma completo
-- Requisitos detallados
-- Participantes elegibles
-- Líneas temáticas (IA y Ciencias Cuánticas)
-
-🚀 **Para usar la landing page:**
-1. Los archivos aparecerán en la pestaña "Code"
-2. Descarga ambos archivos en la misma carpeta
-3. Abre `index.html` en tu navegador
+    def _create_landing_page_files(self) -> Tuple[str, Mapping[str, bytes]]:
+        """
+        Crea los archivos HTML y CSS para la landing page.
 
-¡La landing page está lista para publicar la información de Colombia Inteligente 2025!"""
+        Returns:
+            Tupla con el mensaje para el usuario (con el código en Markdown) y
+            los archivos {"index.html": ..., "styles.css": ...} en bytes, que se
+            pueden escribir directamente sin extraerlos del mensaje
+        """
+        # En lugar de crear archivos directamente, devolver el código para que el agente use herramientas
+        return _build_landing_response(), _landing_page_files()
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from ii_agent.config.bedrock_models import (
+    BEDROCK_MODELS,
+    DEFAULT_MODEL,
+    DEFAULT_MODEL_CONFIG,
+    MODEL_ALIASES,
+    estimate_cost,
+    estimate_cost_batch,
+    estimate_costs_multi,
+    get_model_by_provider,
+    get_model_config,
+    list_available_models,
+)
+
+
+def test_get_model_config_canonical_name():
+    config = get_model_config("nova-pro")
+    assert config.model_id == "amazon.nova-pro-v1:0"
+    assert config is BEDROCK_MODELS["nova-pro"]
+
+
+@pytest.mark.parametrize("alias", sorted(MODEL_ALIASES))
+def test_get_model_config_resolves_aliases(alias):
+    assert get_model_config(alias) is BEDROCK_MODELS[MODEL_ALIASES[alias]]
+
+
+def test_default_model_config():
+    assert DEFAULT_MODEL_CONFIG is get_model_config(DEFAULT_MODEL)
+
+
+def test_get_model_config_unknown_model():
+    with pytest.raises(ValueError, match="no encontrado"):
+        get_model_config("does-not-exist")
+
+
+def test_list_available_models():
+    view = list_available_models()
+    assert dict(view) == BEDROCK_MODELS
+    with pytest.raises(TypeError):
+        view["new-model"] = view["nova-pro"]
+
+    copied = list_available_models(copy=True)
+    assert copied == BEDROCK_MODELS
+    assert copied is not BEDROCK_MODELS
+
+
+def test_get_model_by_provider():
+    anthropic_models = get_model_by_provider("anthropic")
+    assert anthropic_models
+    assert all(config.provider == "anthropic" for config in anthropic_models.values())
+    assert get_model_by_provider("unknown") == {}
+
+    # The result is a copy, so mutating it must not affect later lookups
+    anthropic_models.clear()
+    assert get_model_by_provider("anthropic")
+
+
+def test_estimate_cost():
+    cost = estimate_cost("claude-3-haiku", 2000, 1000)
+    assert cost == pytest.approx(2 * 0.00025 + 0.00125)
+
+
+def test_per_token_rates_are_derived_from_per_1k_rates():
+    config = get_model_config("nova-pro")
+    assert config.cost_per_input_token == pytest.approx(config.cost_per_1k_input_tokens / 1000)
+    assert config.cost_per_output_token == pytest.approx(config.cost_per_1k_output_tokens / 1000)
+
+
+def test_estimate_cost_batch_matches_scalar():
+    input_tokens = np.array([0, 1000, 2500])
+    output_tokens = np.array([500, 0, 1200])
+    costs = estimate_cost_batch("nova", input_tokens, output_tokens)
+    expected = [estimate_cost("nova", i, o) for i, o in zip(input_tokens, output_tokens)]
+    assert costs == pytest.approx(expected)
+
+
+def test_estimate_costs_multi_matches_scalar():
+    model_names = ["nova-pro", "claude", "claude-3-haiku", "titan"]
+    input_tokens = np.array([100, 2000, 0, 750])
+    output_tokens = np.array([50, 400, 3000, 0])
+    costs = estimate_costs_multi(model_names, input_tokens, output_tokens)
+    expected = [
+        estimate_cost(name, i, o)
+        for name, i, o in zip(model_names, input_tokens, output_tokens)
+    ]
+    assert costs == pytest.approx(expected)
+
+
+def test_estimate_costs_multi_unknown_model():
+    with pytest.raises(ValueError, match="no encontrado"):
+        estimate_costs_multi(["nova", "does-not-exist"], np.array([1, 1]), np.array([1, 1]))
+
+
+def test_model_tables_are_read_only():
+    with pytest.raises(TypeError):
+        BEDROCK_MODELS["new-model"] = BEDROCK_MODELS["nova-pro"]
+    with pytest.raises(TypeError):
+        MODEL_ALIASES["new-alias"] = "nova-pro"
@@ -0,0 +1,447 @@
+import asyncio
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import boto3
+import pytest
+
+from ii_agent.llm import bedrock_client
+from ii_agent.llm.base import TextPrompt, TextResult, ToolCall, ToolFormattedResult
+from ii_agent.llm.bedrock_client import (
+    PROMPT_CACHE_MODEL_PREFIXES,
+    BedrockClient,
+    _estimate_tokens,
+    _minify_css,
+    iter_landing_response,
+)
+
+CLAUDE_MODEL_ID = "anthropic.claude-3-7-sonnet-20250219-v1:0"
+
+
+class _BlockingRuntime:
+    """Stub bedrock-runtime client whose invoke_model blocks like a real HTTP call."""
+
+    def __init__(self, delay=0.0, text="ok"):
+        self.delay = delay
+        self.text = text
+        self.calls = 0
+
+    def invoke_model(self, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        payload = {
+            "content": [{"type": "text", "text": self.text}],
+            "usage": {"input_tokens": 1, "output_tokens": 1},
+        }
+        return {"body": io.BytesIO(json.dumps(payload).encode("utf-8"))}
+
+
+class _FakeSession:
+    """Stub boto3.Session that records every runtime client it builds."""
+
+    created = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def client(self, service_name, config):
+        runtime = SimpleNamespace(service_name=service_name, config=config, session=self)
+        _FakeSession.created.append(runtime)
+        return runtime
+
+
+@pytest.fixture(autouse=True)
+def fake_aws(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test-key")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test-secret")
+    monkeypatch.delenv("BEDROCK_MAX_POOL", raising=False)
+    monkeypatch.setattr(boto3, "Session", _FakeSession)
+    monkeypatch.setattr(bedrock_client, "_CLIENT_CACHE", {})
+    monkeypatch.setattr(_FakeSession, "created", [])
+    return _FakeSession.created
+
+
+def _make_client(runtime, model_id=CLAUDE_MODEL_ID, temperature=0.7, max_tokens=256):
+    client = BedrockClient(model_name=model_id, temperature=temperature, max_tokens=max_tokens)
+    client.client = runtime
+    return client
+
+
+def _generate(client, text):
+    return asyncio.run(client.generate_response([{"role": "user", "content": text}]))
+
+
+def test_clients_share_one_runtime_client(fake_aws):
+    first = BedrockClient(model_name=CLAUDE_MODEL_ID)
+    second = BedrockClient(model_name="amazon.nova-pro-v1:0")
+    assert first.client is second.client
+    assert len(fake_aws) == 1
+    assert first.client.service_name == "bedrock-runtime"
+    assert first.client.session.kwargs == {
+        "aws_access_key_id": "test-key",
+        "aws_secret_access_key": "test-secret",
+        "region_name": "us-east-1",
+    }
+
+    # Different credentials or region must not reuse the shared client
+    other = BedrockClient(model_name=CLAUDE_MODEL_ID, region="eu-west-1")
+    assert other.client is not first.client
+
+
+def test_refresh_replaces_shared_client(fake_aws):
+    client = BedrockClient(model_name=CLAUDE_MODEL_ID)
+    stale = client.client
+    client._initialize_client(refresh=True)
+    assert client.client is not stale
+    assert BedrockClient(model_name=CLAUDE_MODEL_ID).client is client.client
+    assert len(fake_aws) == 2
+
+
+def test_unsupported_model_raises():
+    with pytest.raises(ValueError, match="no soportado"):
+        BedrockClient(model_name="amazon.titan-text-express-v1")
+
+
+def test_missing_credentials_raise(monkeypatch):
+    monkeypatch.delenv("AWS_SECRET_ACCESS_KEY")
+    with pytest.raises(ValueError, match="AWS credentials"):
+        BedrockClient(model_name=CLAUDE_MODEL_ID)
+
+
+def test_client_config(monkeypatch):
+    client = BedrockClient(model_name=CLAUDE_MODEL_ID)
+    config = client.client.config
+    assert client.max_pool_connections == config.max_pool_connections == 100
+    # A single HTTP send per call; tenacity owns the retries
+    assert config.retries == {"total_max_attempts": 1, "mode": "standard"}
+    assert (config.connect_timeout, config.read_timeout, config.tcp_keepalive) == (3, 60, True)
+
+    monkeypatch.setenv("BEDROCK_MAX_POOL", "8")
+    assert BedrockClient(model_name=CLAUDE_MODEL_ID).client.config.max_pool_connections == 8
+    explicit = BedrockClient(model_name=CLAUDE_MODEL_ID, max_pool_connections=4)
+    assert explicit.client.config.max_pool_connections == 4
+
+
+def test_reconnect_client_waits_without_blocking(monkeypatch, fake_aws):
+    client = BedrockClient(model_name=CLAUDE_MODEL_ID)
+    stale = client.client
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    def blocking_sleep(delay):
+        raise AssertionError("_reconnect_client must not block the event loop")
+
+    monkeypatch.setattr(bedrock_client.random, "uniform", lambda a, b: 0.5)
+    monkeypatch.setattr(bedrock_client.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(time, "sleep", blocking_sleep)
+
+    assert asyncio.run(client._reconnect_client()) is True
+    assert delays == [2.5]
+    assert client.client is not stale
+    assert client.reconnect_attempts == 0
+
+    client.reconnect_attempts = client.max_reconnect_attempts
+    assert asyncio.run(client._reconnect_client()) is False
+    assert delays == [2.5]
+
+
+def test_deterministic_responses_are_cached():
+    runtime = _BlockingRuntime()
+    client = _make_client(runtime, temperature=0)
+    assert _generate(client, "hello") == "ok"
+    assert _generate(client, "hello") == "ok"
+    assert runtime.calls == 1
+
+    _generate(client, "another question")
+    assert runtime.calls == 2
+
+
+def test_response_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(BedrockClient, "RESPONSE_CACHE_SIZE", 2)
+    runtime = _BlockingRuntime()
+    client = _make_client(runtime, temperature=0)
+    for text in ("a", "b", "a", "c"):  # "b" is the least recently used when "c" arrives
+        _generate(client, text)
+    assert runtime.calls == 3
+    assert len(client._resp_cache) == 2
+
+    _generate(client, "a")
+    assert runtime.calls == 3
+    _generate(client, "b")
+    assert runtime.calls == 4
+
+
+def test_sampled_responses_are_not_cached():
+    runtime = _BlockingRuntime()
+    client = _make_client(runtime, temperature=0.7)
+    _generate(client, "hello")
+    _generate(client, "hello")
+    assert runtime.calls == 2
+    assert not client._resp_cache
+
+
+PROMPT_MESSAGES = [
+    {"role": "system", "content": "be brief"},
+    {"role": "user", "content": "hello"},
+]
+
+
+def test_claude_body_marks_system_prompt_as_cache_point():
+    body = _make_client(_BlockingRuntime())._format_body(PROMPT_MESSAGES)
+    assert body["system"] == [
+        {"type": "text", "text": "be brief", "cache_control": {"type": "ephemeral"}}
+    ]
+    assert body["messages"] == [{"role": "user", "content": "hello"}]
+
+
+def test_claude_body_without_prompt_cache_support():
+    client = _make_client(_BlockingRuntime(), model_id="anthropic.claude-3-haiku-20240307-v1:0")
+    body = client._format_body(PROMPT_MESSAGES)
+    assert body["system"] == "be brief"
+
+
+def test_nova_body_moves_system_prompt_before_cache_point():
+    client = _make_client(_BlockingRuntime(), model_id="amazon.nova-pro-v1:0")
+    body = client._format_body(PROMPT_MESSAGES)
+    assert body["system"] == [{"text": "be brief"}, {"cachePoint": {"type": "default"}}]
+    assert body["messages"] == [{"role": "user", "content": [{"text": "hello"}]}]
+
+
+def test_nova_body_without_prompt_cache_support():
+    client = _make_client(_BlockingRuntime(), model_id="amazon.nova-premier-v1:0")
+    body = client._format_body(PROMPT_MESSAGES)
+    assert "system" not in body
+    assert body["messages"] == [
+        {"role": "user", "content": [{"text": "be brief"}]},
+        {"role": "user", "content": [{"text": "hello"}]},
+    ]
+
+
+def _stream_client(claude: bool):
+    # Only the attributes used by _extract_stream_delta; no AWS client is built
+    if claude:
+        return SimpleNamespace(
+            _stream_delta_marker=b'"content_block_delta"',
+            _parse_stream_delta=BedrockClient._parse_claude_stream_delta,
+        )
+    return SimpleNamespace(
+        _stream_delta_marker=b'"contentBlockDelta"',
+        _parse_stream_delta=BedrockClient._parse_nova_stream_delta,
+    )
+
+
+def _event(payload, ensure_ascii=False):
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=ensure_ascii)
+    return {"chunk": {"bytes": raw.encode("utf-8")}}
+
+
+@pytest.mark.parametrize("ensure_ascii", [False, True])
+@pytest.mark.parametrize("text", ["Hola ñ", 'with "quotes"\nand newline', ""])
+def test_extract_stream_delta_claude(text, ensure_ascii):
+    client = _stream_client(claude=True)
+    event = _event(
+        {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text}},
+        ensure_ascii,
+    )
+    assert BedrockClient._extract_stream_delta(client, event) == text
+
+
+@pytest.mark.parametrize("ensure_ascii", [False, True])
+@pytest.mark.parametrize("text", ["Nova ñ", "back\\slash"])
+def test_extract_stream_delta_nova(text, ensure_ascii):
+    client = _stream_client(claude=False)
+    event = _event({"contentBlockDelta": {"delta": {"text": text}, "contentBlockIndex": 0}}, ensure_ascii)
+    assert BedrockClient._extract_stream_delta(client, event) == text
+
+
+def test_extract_stream_delta_ignores_non_text_events():
+    claude = _stream_client(claude=True)
+    nova = _stream_client(claude=False)
+    assert BedrockClient._extract_stream_delta(claude, {}) is None
+    assert BedrockClient._extract_stream_delta(
+        claude, _event({"type": "content_block_start", "content_block": {"type": "text", "text": ""}})
+    ) is None
+    assert BedrockClient._extract_stream_delta(nova, _event({"messageStart": {"role": "assistant"}})) is None
+
+
+def test_minify_css():
+    css = """/* Header */
+.hero,
+.footer {
+    color: white;
+    padding: 1rem 0;
+}
+
+@media (max-width: 768px) {
+    .nav-links a:hover {
+        opacity: 0.8;
+    }
+}"""
+    assert _minify_css(css) == (
+        ".hero,.footer{color:white;padding:1rem 0}"
+        "@media (max-width:768px){.nav-links a:hover{opacity:0.8}}"
+    )
+
+
+def test_iter_landing_response_matches_message():
+    client = _make_client(_BlockingRuntime())
+    message, files = client._create_landing_page_files()
+    assert "".join(iter_landing_response()) == message
+    assert files["index.html"].decode("utf-8") in message
+    assert files["styles.css"].decode("utf-8") in message
+
+
+def test_concurrent_generate_calls_overlap():
+    delay = 0.3
+    client = _make_client(_BlockingRuntime(delay=delay))
+
+    def call(i):
+        return client.generate([[TextPrompt(text=f"question {i}")]], max_tokens=64)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(call, range(4)))
+    elapsed = time.perf_counter() - start
+
+    assert [blocks[0].text for blocks, _ in results] == ["ok"] * 4
+    # Serialized calls would take 4 * delay
+    assert elapsed < 2 * delay
+
+
+def test_generate_async_does_not_block_the_event_loop():
+    delay = 0.3
+    client = _make_client(_BlockingRuntime(delay=delay))
+    ticks = []
+
+    async def ticker():
+        start = time.perf_counter()
+        while time.perf_counter() - start < delay:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.02)
+
+    async def main():
+        start = time.perf_counter()
+        first, second, _ = await asyncio.gather(
+            client.generate_async([[TextPrompt(text="a")]], max_tokens=64),
+            client.generate_async([[TextPrompt(text="b")]], max_tokens=64),
+            ticker(),
+        )
+        return first, second, time.perf_counter() - start
+
+    first, second, elapsed = asyncio.run(main())
+
+    assert first[0][0].text == second[0][0].text == "ok"
+    # Both calls overlap instead of running back to back
+    assert elapsed < 1.5 * delay
+    # The loop kept scheduling other coroutines while the calls were in flight
+    assert len(ticks) >= 5
+
+
+def test_generate_removes_only_accepted_tool_calls_from_text():
+    bash_call = '{"name": "bash_tool", "arguments": {"command": "ls"}}'
+    search_call = '{"name": "web_search", "arguments": {"query": "news"}}'
+    response = f"Intro {bash_call} middle {search_call} end"
+    client = _make_client(_BlockingRuntime(text=response))
+
+    # One earlier search in the conversation: a second web_search call is skipped
+    history = [[TextPrompt(text="I was searching the web")], [TextPrompt(text="now list files")]]
+    results, _ = client.generate(history, max_tokens=64)
+
+    text, tool_call = results
+    assert text.text == f"Intro  middle {search_call} end"
+    assert tool_call.tool_name == "bash_tool"
+    assert tool_call.tool_input == {"command": "ls"}
+
+
+def test_normalize_message_groups():
+    messages = [
+        [TextPrompt(text="hello"), ToolCall(tool_call_id="call_0", tool_name="bash_tool", tool_input={})],
+        {"role": "assistant", "content": "hi"},
+        [{"role": "user", "content": "raw"}],
+        [ToolFormattedResult(tool_call_id="call_0", tool_name="bash_tool", tool_output="done")],
+        "ignored",
+    ]
+    # Blocks without text are dropped, but every input group keeps its slot
+    assert BedrockClient._normalize_message_groups(messages) == [
+        [{"role": "user", "content": "hello"}],
+        [{"role": "assistant", "content": "hi"}],
+        [{"role": "user", "content": "raw"}],
+        [],
+        [],
+    ]
+
+
+def _tool_loop_turns(planning_text, turns=4):
+    # Shape of MessageHistory in a tool loop: [TextResult, ToolCall] then [ToolFormattedResult]
+    history = [[TextPrompt(text="Write a short report")]]
+    for i in range(turns):
+        history.append([
+            TextResult(text=planning_text),
+            ToolCall(tool_call_id=f"call_{i}", tool_name="bash_tool", tool_input={"command": "ls"}),
+        ])
+        history.append([ToolFormattedResult(tool_call_id=f"call_{i}", tool_name="bash_tool", tool_output="ok")])
+    return history
+
+
+def test_anti_loop_window_covers_the_last_five_groups():
+    client = _make_client(_BlockingRuntime(text="model answer"))
+    # Only two planning turns fall inside the last five groups, so the rule must not fire
+    results, _ = client.generate(_tool_loop_turns("Let's plan the next step"), max_tokens=64)
+    assert [block.text for block in results] == ["model answer"]
+
+
+def test_anti_loop_reads_the_last_group_text():
+    client = _make_client(_BlockingRuntime(text="model answer"))
+    history = _tool_loop_turns("Let's plan the next step", turns=3)
+    history.append([TextResult(text="Planning the landing"), TextResult(text=" page layout")])
+    # Three planning turns fire the rule; the last group mentions a landing page, which is exempt
+    results, _ = client.generate(history, max_tokens=64)
+    assert [block.text for block in results] == ["model answer"]
+
+    history[-1] = [TextResult(text="Planning the report")]
+    results, _ = client.generate(history, max_tokens=64)
+    assert results[0].text.startswith("Basándome en las búsquedas")
+
+
+def test_count_loop_signals_counts_each_message_once():
+    messages = [
+        {"role": "user", "content": "Searching... then web_search again"},
+        {"role": "assistant", "content": "Let's plan this. We need to plan the creation"},
+        {"role": "assistant", "content": "PLANNING while using WEB_SEARCH"},
+        {"role": "user", "content": "nothing relevant"},
+        {"role": "user", "content": ["not", "a", "string"]},
+    ]
+    assert BedrockClient._count_loop_signals(messages) == (2, 2)
+    assert BedrockClient._count_loop_signals([]) == (0, 0)
+
+
+def test_parse_responses_report_usage():
+    claude_body = {
+        "content": [{"type": "text", "text": "claude"}],
+        "usage": {"input_tokens": 10, "output_tokens": 5},
+    }
+    nova_body = {
+        "output": {"message": {"content": [{"text": "nova"}]}},
+        "usage": {"inputTokens": 3, "outputTokens": 4, "totalTokens": 7},
+    }
+    assert BedrockClient._parse_claude_response(claude_body) == ("claude", 15)
+    assert BedrockClient._parse_nova_response(nova_body) == ("nova", 7)
+    # Missing usage reports zero so the caller falls back to the estimate
+    assert BedrockClient._parse_claude_response({"content": [{"text": "x"}]}) == ("x", 0)
+
+
+def test_generate_reports_bedrock_usage():
+    client = _make_client(_BlockingRuntime(text="answer"))
+    _, metadata = client.generate([[TextPrompt(text="hello")]], max_tokens=64)
+    # _BlockingRuntime reports one input and one output token
+    assert metadata == {"usage": {"total_tokens": 2}}
+
+
+def test_estimate_tokens():
+    assert _estimate_tokens("") == 1
+    assert _estimate_tokens("x" * 400) == 100
@@ -0,0 +1,118 @@
+import asyncio
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("websockets")
+
+# simple_server.py lives at the repository root, outside src/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import simple_server  # noqa: E402
+from simple_server import NOVA_CACHE_TTL, SEARCH_CACHE_TTL, SimpleIIAgent  # noqa: E402
+
+WEB_QUERY = "Últimas noticias de IA"
+
+
+class _FakeLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_response(self, messages):
+        self.calls += 1
+        return f"answer {self.calls}"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Only the cache reads the clock; the event loop keeps the real time module
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(simple_server, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def _make_agent(search_ok=True):
+    # SimpleIIAgent.__init__ creates a workspace directory and a Bedrock client
+    agent = object.__new__(SimpleIIAgent)
+    agent._response_cache = OrderedDict()
+    agent._cache_lock = asyncio.Lock()
+    agent.llm_client = _FakeLLM()
+    agent.searches = 0
+
+    async def search_web(query):
+        agent.searches += 1
+        return ("results", True) if search_ok else ("Error en búsqueda web: 500", False)
+
+    agent._search_web = search_web
+    return agent
+
+
+def test_cache_entries_expire_after_ttl(clock):
+    async def scenario():
+        agent = _make_agent()
+        await agent._cache_put("nova", "Hello  World", "cached", 10)
+        clock.value += 10
+        assert await agent._cache_get("nova", "  hello world ") == "cached"
+        clock.value += 1
+        assert await agent._cache_get("nova", "hello world") is None
+        assert not agent._response_cache
+
+    asyncio.run(scenario())
+
+
+def test_cache_evicts_least_recently_used(monkeypatch, clock):
+    monkeypatch.setattr(simple_server, "RESPONSE_CACHE_MAX_ENTRIES", 3)
+
+    async def scenario():
+        agent = _make_agent()
+        for text in ("a", "b", "c"):
+            await agent._cache_put("search", text, text.upper(), 60)
+        assert await agent._cache_get("search", "a") == "A"
+        await agent._cache_put("search", "d", "D", 60)
+        assert list(agent._response_cache) == [("search", "c"), ("search", "a"), ("search", "d")]
+        assert await agent._cache_get("search", "b") is None
+
+    asyncio.run(scenario())
+
+
+def test_nova_answers_use_nova_ttl(clock):
+    async def scenario():
+        agent = _make_agent()
+        assert await agent.get_nova_response("Hola") == "answer 1"
+        assert await agent.get_nova_response("hola") == "answer 1"
+        assert agent.llm_client.calls == 1
+        assert agent.searches == 0
+        expires_at, _ = agent._response_cache[("nova", "hola")]
+        assert expires_at == clock.value + NOVA_CACHE_TTL
+
+    asyncio.run(scenario())
+
+
+def test_search_backed_answers_expire_with_the_search(clock):
+    async def scenario():
+        agent = _make_agent()
+        assert await agent.get_nova_response(WEB_QUERY) == "answer 1"
+        assert agent.searches == 1
+        expires_at, _ = agent._response_cache[("nova", "últimas noticias de ia")]
+        assert expires_at == clock.value + SEARCH_CACHE_TTL
+
+        clock.value += SEARCH_CACHE_TTL + 1
+        assert await agent.get_nova_response(WEB_QUERY) == "answer 2"
+        assert agent.searches == 2
+
+    asyncio.run(scenario())
+
+
+def test_answers_after_failed_search_are_not_cached(clock):
+    async def scenario():
+        agent = _make_agent(search_ok=False)
+        assert await agent.get_nova_response(WEB_QUERY) == "answer 1"
+        assert not agent._response_cache
+        assert await agent.get_nova_response(WEB_QUERY) == "answer 2"
+        assert agent.searches == 2
+
+    asyncio.run(scenario())